@@ -0,0 +1,169 @@
+"""
+The batch_runner module simulates many headless Turtle's Adventure games in
+parallel, one process per CPU core, to evaluate level balance.  Each run has
+its own seed, level and input, either scripted or replayed from a recording,
+and the results are aggregated into a summary table.
+
+Usage: python batch_runner.py [--runs 1000] [--levels 1] [--scripts home random]
+                              [--replay SESSION_FILE ...] [--workers N]
+                              [--max-ticks 3000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Final
+
+from replay import Recording, replay
+from turtle_adventure import load_level_data
+
+SCREEN_WIDTH: Final = 800
+SCREEN_HEIGHT: Final = 500
+SCRIPTS: Final = ("idle", "home", "random")
+
+
+def scripted_recording(script: str, seed: int, level: int, max_ticks: int) -> Recording:
+    """
+    Build the input of a scripted player as a recording:
+    "idle" never clicks, "home" clicks on home once at the start and
+    "random" clicks on a random spot every second.
+    """
+    recording = Recording(seed, level, SCREEN_WIDTH, SCREEN_HEIGHT)
+    if script == "home":
+        home_x, home_y = load_level_data(level, SCREEN_WIDTH, SCREEN_HEIGHT).home
+        recording.record(0, home_x, home_y)
+    elif script == "random":
+        # same derivation as TurtleAdventureGame.rng, on a stream of its own
+        rng = random.Random(f"{seed}:script")
+        for tick in range(0, max_ticks, 30):
+            recording.record(tick, rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+    elif script != "idle":
+        raise ValueError(f"unknown script {script!r}, expected one of {', '.join(SCRIPTS)}")
+    return recording
+
+
+def run_one(spec: dict) -> dict:
+    """
+    Simulate a single game described by spec, which holds "seed", "level",
+    "max_ticks" and either "script" or "replay" (a recording file), and
+    return its outcome and timing.  Runs in a worker process.
+    """
+    if spec.get("replay"):
+        recording = Recording.load(spec["replay"])
+        label = os.path.basename(spec["replay"])
+    else:
+        recording = scripted_recording(spec["script"], spec["seed"], spec["level"],
+                                       spec["max_ticks"])
+        label = spec["script"]
+    start = time.perf_counter()
+    game = replay(recording, spec["max_ticks"])
+    elapsed = time.perf_counter() - start
+    return {
+        "seed": recording.seed,
+        "level": recording.level,
+        "input": label,
+        "outcome": game.outcome or "none",
+        "ticks": game.tick,
+        "seconds": elapsed,
+    }
+
+
+def run_batch(specs: list[dict], workers: int | None = None) -> list[dict]:
+    """
+    Simulate all runs across a pool of worker processes and return their
+    results in the order of specs.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_one(spec) for spec in specs]
+    chunksize = max(1, len(specs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_one, specs, chunksize=chunksize))
+
+
+def summarize(results: list[dict]) -> list[dict]:
+    """
+    Aggregate results by level and input into win/lose rates, ticks to
+    outcome and per-run timing.
+    """
+    groups: dict[tuple[int, str], list[dict]] = {}
+    for result in results:
+        groups.setdefault((result["level"], result["input"]), []).append(result)
+    rows = []
+    for (level, label), runs in sorted(groups.items()):
+        ended = [run["ticks"] for run in runs if run["outcome"] != "none"]
+        seconds = [run["seconds"] for run in runs]
+        rows.append({
+            "level": level,
+            "input": label,
+            "runs": len(runs),
+            "win_rate": sum(run["outcome"] == "win" for run in runs) / len(runs),
+            "lose_rate": sum(run["outcome"] == "lose" for run in runs) / len(runs),
+            "mean_ticks_to_outcome": statistics.fmean(ended) if ended else None,
+            "median_ticks_to_outcome": statistics.median(ended) if ended else None,
+            "mean_run_ms": statistics.fmean(seconds) * 1000,
+            "max_run_ms": max(seconds) * 1000,
+        })
+    return rows
+
+
+def print_summary(rows: list[dict]) -> None:
+    """
+    Print the summary rows as a table.
+    """
+    print(f"{'level':>5}  {'input':<16}{'runs':>6}{'win':>8}{'lose':>8}"
+          f"{'ticks p50':>11}{'ticks avg':>11}{'run ms':>9}{'max ms':>9}")
+    for row in rows:
+        median = row["median_ticks_to_outcome"]
+        mean = row["mean_ticks_to_outcome"]
+        print(f"{row['level']:>5}  {row['input']:<16}{row['runs']:>6}"
+              f"{row['win_rate']:>8.1%}{row['lose_rate']:>8.1%}"
+              f"{'-' if median is None else f'{median:.0f}':>11}"
+              f"{'-' if mean is None else f'{mean:.1f}':>11}"
+              f"{row['mean_run_ms']:>9.2f}{row['max_run_ms']:>9.2f}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Build the run specifications from the command line, simulate them and
+    report the summary.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--runs", type=int, default=1000,
+                        help="runs per level and script, each with its own seed")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1], help="levels to simulate")
+    parser.add_argument("--scripts", nargs="*", default=["home", "random"], choices=SCRIPTS,
+                        help="scripted inputs to simulate")
+    parser.add_argument("--replay", nargs="*", default=[], metavar="SESSION_FILE",
+                        help="recordings to replay once each")
+    parser.add_argument("--seed-base", type=int, default=0, help="seed of the first run")
+    parser.add_argument("--max-ticks", type=int, default=3000,
+                        help="ticks after which an unfinished game is counted as 'none'")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU core)")
+    parser.add_argument("--output", default=None, help="also write all results as JSON")
+    args = parser.parse_args(argv)
+
+    specs = [{"seed": args.seed_base + i, "level": level, "script": script,
+              "max_ticks": args.max_ticks}
+             for level in args.levels for script in args.scripts for i in range(args.runs)]
+    specs += [{"replay": path, "max_ticks": args.max_ticks} for path in args.replay]
+
+    start = time.perf_counter()
+    results = run_batch(specs, args.workers)
+    elapsed = time.perf_counter() - start
+    rows = summarize(results)
+    print_summary(rows)
+    total_ticks = sum(result["ticks"] for result in results)
+    print(f"{len(results)} runs, {total_ticks} ticks in {elapsed:.2f} s "
+          f"({total_ticks / elapsed:.0f} ticks/s, {args.workers or os.cpu_count()} workers)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"summary": rows, "runs": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+The benchmark module measures how TurtleAdventureGame scales with the number
+of enemies.  Each run populates a headless game through EnemyGenerator and
+records update, render and collision time per tick, then writes the results
+to a JSON file so that they can be compared across commits.  With --memory,
+it instead compares the memory used per enemy by the __slots__-based element
+classes against equivalent classes with a per-instance __dict__.  With
+--spatial, it compares neighbourhood queries through the game's spatial
+indexes against brute-force scans of all enemies, for uniform and clustered
+enemy layouts.
+
+Usage: python benchmark.py [--counts 10 100 1000 10000] [--ticks 100]
+                           [--memory | --spatial] [--output benchmark_results.json]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Final
+
+import numpy as np
+
+from spatial import INDEX_TYPES
+from turtle_adventure import (TurtleAdventureGame, Enemy, ChasingEnemy, RandomEnemy,
+                              FencingEnemy, FrontGateEnermy)
+
+SCREEN_WIDTH: Final = 800
+SCREEN_HEIGHT: Final = 500
+ENEMY_TYPES: Final = (ChasingEnemy, RandomEnemy, FencingEnemy, FrontGateEnermy)
+DEFAULT_COUNTS: Final = (10, 100, 1000, 10000)
+SPATIAL_COUNTS: Final = (1000, 5000, 10000, 50000)
+QUERY_RADIUS: Final = 25
+
+
+class BenchmarkGame(TurtleAdventureGame):  # pylint: disable=too-many-ancestors
+    """
+    A headless TurtleAdventureGame with an invincible player that records
+    the time spent in each phase of every tick.
+    """
+
+    def __init__(self, screen_width: int, screen_height: int, seed: int = 0):
+        self.update_times: list[float] = []
+        self.render_times: list[float] = []
+        self.collision_times: list[float] = []
+        self.hits: int = 0
+        super().__init__(None, screen_width, screen_height, headless=True, seed=seed)
+
+    def update_elements(self) -> None:
+        start = time.perf_counter()
+        super().update_elements()
+        self.update_times.append(time.perf_counter() - start)
+
+    def render_elements(self) -> None:
+        start = time.perf_counter()
+        super().render_elements()
+        self.render_times.append(time.perf_counter() - start)
+
+    def resolve_collisions(self) -> str | None:
+        start = time.perf_counter()
+        outcome = super().resolve_collisions()
+        self.collision_times.append(time.perf_counter() - start)
+        # count the hit but keep enemies moving, so that every run does the
+        # same amount of work for the same number of ticks
+        self.hits += outcome == "lose"
+        return None
+
+    def game_over_win(self) -> None:
+        pass
+
+    def game_over_lose(self) -> None:
+        pass
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Return the nearest-rank percentile of values.
+    """
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize_ms(values: list[float]) -> dict[str, float]:
+    """
+    Summarize a list of durations in seconds as milliseconds.
+    """
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    return {
+        "mean": sum(values) / len(values) * 1000,
+        "p50": percentile(values, 50) * 1000,
+        "p95": percentile(values, 95) * 1000,
+        "p99": percentile(values, 99) * 1000,
+    }
+
+
+def run_case(enemy_type: type[Enemy], count: int, ticks: int, seed: int = 0) -> dict:
+    """
+    Run a headless game with count enemies of the given type for the given
+    number of ticks and return its timing statistics.
+    """
+    game = BenchmarkGame(SCREEN_WIDTH, SCREEN_HEIGHT, seed)
+    rng = game.rng("benchmark")
+    for _ in range(count):
+        game.enemy_generator.spawn(enemy_type,
+                                   rng.uniform(0, SCREEN_WIDTH),
+                                   rng.uniform(0, SCREEN_HEIGHT))
+    game.start()
+    wall_start = time.perf_counter()
+    ran = game.run_headless(ticks)
+    wall_time = time.perf_counter() - wall_start
+
+    frames = [u + r for u, r in zip(game.update_times, game.render_times)]
+    return {
+        "enemy_type": enemy_type.__name__,
+        "enemies": count,
+        "ticks": game.tick,
+        "ticks_per_sec": ran / wall_time if wall_time else 0.0,
+        "update_ms": summarize_ms(game.update_times),
+        "render_ms": summarize_ms(game.render_times),
+        "collision_ms": summarize_ms(game.collision_times),
+        "frame_ms": summarize_ms(frames),
+        "canvas_calls": game.canvas.call_count,
+        "player_hits": game.hits,
+    }
+
+
+def measure_element_bytes(enemy_type: type[Enemy], count: int, slotted: bool = True) -> float:
+    """
+    Return the average number of bytes allocated per enemy when creating
+    count enemies of the given type.  With slotted=False, a subclass without
+    __slots__ is used, so each instance also carries a __dict__.
+    """
+    if not slotted:
+        enemy_type = type(f"Dict{enemy_type.__name__}", (enemy_type,), {})
+    game = BenchmarkGame(SCREEN_WIDTH, SCREEN_HEIGHT)
+    # allocate the entity columns up front so that only the objects count
+    game.entities.reserve(game.entities.high_water + count)
+    game.enemy_engine.reserve(game.entities.capacity)
+    enemies = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        enemies.append(enemy_type(game, 20, "red"))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def run_memory(count: int) -> list[dict]:
+    """
+    Compare per-enemy memory of slotted and dict-based enemies of each type.
+    """
+    results = []
+    print(f"{'enemy type':<16}{'dict bytes':>12}{'slots bytes':>13}{'saved':>8}")
+    for enemy_type in ENEMY_TYPES:
+        with_dict = measure_element_bytes(enemy_type, count, slotted=False)
+        with_slots = measure_element_bytes(enemy_type, count, slotted=True)
+        results.append({"enemy_type": enemy_type.__name__, "enemies": count,
+                        "dict_bytes_per_element": with_dict,
+                        "slots_bytes_per_element": with_slots})
+        print(f"{enemy_type.__name__:<16}{with_dict:>12.1f}{with_slots:>13.1f}"
+              f"{1 - with_slots / with_dict:>8.0%}")
+    return results
+
+
+def brute_force_radius(game: TurtleAdventureGame, x: float, y: float,
+                       radius: float) -> list[Enemy]:
+    """
+    Return the enemies within radius of (x, y) by testing every enemy.
+    """
+    engine = game.enemy_engine
+    rows = engine.rows
+    dx = engine.x[rows] - x
+    dy = engine.y[rows] - y
+    owner = game.entities.owner
+    return [owner(row) for row in rows[dx * dx + dy * dy <= radius * radius].tolist()]
+
+
+def layout_positions(layout: str, count: int, rng) -> list[tuple[float, float]]:
+    """
+    Return count enemy positions spread over the screen ("uniform") or
+    packed around home like fencing and front-gate enemies ("clustered").
+    """
+    if layout == "uniform":
+        return [(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+                for _ in range(count)]
+    home_x, home_y = SCREEN_WIDTH - 100, SCREEN_HEIGHT // 2
+    return [(rng.gauss(home_x, 40), rng.gauss(home_y, 40)) for _ in range(count)]
+
+
+# pylint: disable=too-many-arguments
+def run_spatial_case(count: int, queries: int, seed: int = 0, layout: str = "uniform",
+                     index: str = "grid", ticks: int = 20) -> dict:
+    """
+    Time query_radius() through the given spatial index against a
+    brute-force scan, around the positions of randomly picked enemies, in a
+    game with count random walkers laid out as given.  Also time the
+    per-tick collision check, which keeps the index in sync.
+    """
+    game = BenchmarkGame(SCREEN_WIDTH, SCREEN_HEIGHT, seed)
+    game.set_spatial_index(index)
+    rng = game.rng("benchmark")
+    for x, y in layout_positions(layout, count, rng):
+        game.enemy_generator.spawn(RandomEnemy, x, y)
+    game.start()
+    game.run_headless(ticks)  # the index has to follow the batched moves
+    engine = game.enemy_engine
+    picked = [rng.choice(engine.rows) for _ in range(queries)]
+    points = [(float(engine.x[row]), float(engine.y[row])) for row in picked]
+
+    start = time.perf_counter()
+    index_results = [game.query_radius(x, y, QUERY_RADIUS) for x, y in points]
+    index_time = time.perf_counter() - start
+    start = time.perf_counter()
+    brute_results = [brute_force_radius(game, x, y, QUERY_RADIUS) for x, y in points]
+    brute_time = time.perf_counter() - start
+    if any(set(a) != set(b) for a, b in zip(index_results, brute_results)):
+        raise AssertionError(f"{index} and brute-force queries disagree")
+    return {
+        "layout": layout,
+        "index": index,
+        "enemies": count,
+        "queries": queries,
+        "radius": QUERY_RADIUS,
+        "mean_results": sum(map(len, index_results)) / queries,
+        "index_us": index_time / queries * 1e6,
+        "brute_force_us": brute_time / queries * 1e6,
+        "collision_ms": summarize_ms(game.collision_times),
+    }
+
+
+def run_spatial(counts: list[int], queries: int, seed: int = 0) -> list[dict]:
+    """
+    Compare neighbourhood queries through each spatial index with
+    brute-force scans, for uniform and clustered layouts of each count.
+    """
+    results = []
+    print(f"{'layout':<11}{'index':<10}{'enemies':>8}{'found':>8}{'query us':>10}"
+          f"{'brute us':>10}{'speedup':>9}{'collide ms':>12}")
+    for layout in ("uniform", "clustered"):
+        for count in counts:
+            for index in INDEX_TYPES:
+                case = run_spatial_case(count, queries, seed, layout, index)
+                results.append(case)
+                print(f"{layout:<11}{index:<10}{count:>8}{case['mean_results']:>8.1f}"
+                      f"{case['index_us']:>10.1f}{case['brute_force_us']:>10.1f}"
+                      f"{case['brute_force_us'] / case['index_us']:>8.1f}x"
+                      f"{case['collision_ms']['mean']:>12.3f}")
+    return results
+
+
+def git_commit() -> str | None:
+    """
+    Return the current git commit hash, if available.
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Run all benchmark cases and write the results to a JSON file.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=None,
+                        help="enemy counts to benchmark for each enemy type "
+                             f"(default: {DEFAULT_COUNTS}, or {SPATIAL_COUNTS} with --spatial)")
+    parser.add_argument("--ticks", type=int, default=100, help="ticks per run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the simulated games")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--memory", action="store_true",
+                      help="measure bytes per enemy instead of tick timings")
+    mode.add_argument("--spatial", action="store_true",
+                      help="time spatial-index against brute-force queries instead")
+    parser.add_argument("--queries", type=int, default=1000,
+                        help="queries per enemy count with --spatial")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="path of the JSON results file")
+    args = parser.parse_args(argv)
+    if args.counts is None and not args.spatial:
+        args.counts = list(DEFAULT_COUNTS)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+    if args.memory:
+        report["memory"] = run_memory(max(args.counts))
+        write_report(report, args.output)
+        return
+    if args.spatial:
+        report["spatial"] = run_spatial(args.counts or list(SPATIAL_COUNTS), args.queries,
+                                        args.seed)
+        write_report(report, args.output)
+        return
+
+    results = []
+    print(f"{'enemy type':<16}{'count':>7}{'ticks/s':>10}{'update':>9}{'render':>9}"
+          f"{'collide':>9}{'p50':>8}{'p95':>8}{'p99':>8}   (ms)")
+    for enemy_type in ENEMY_TYPES:
+        for count in args.counts:
+            case = run_case(enemy_type, count, args.ticks, args.seed)
+            results.append(case)
+            frame = case["frame_ms"]
+            print(f"{case['enemy_type']:<16}{count:>7}{case['ticks_per_sec']:>10.0f}"
+                  f"{case['update_ms']['mean']:>9.3f}{case['render_ms']['mean']:>9.3f}"
+                  f"{case['collision_ms']['mean']:>9.3f}{frame['p50']:>8.3f}"
+                  f"{frame['p95']:>8.3f}{frame['p99']:>8.3f}")
+
+    report["ticks"] = args.ticks
+    report["results"] = results
+    write_report(report, args.output)
+
+
+def write_report(report: dict, path: str) -> None:
+    """
+    Write the benchmark report as JSON.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
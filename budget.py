@@ -0,0 +1,115 @@
+"""
+The budget module provides FrameBudget, an opt-in frame-time manager for
+Game.  It measures how long each frame takes and, while frames run over
+budget, progressively cuts rendering work; the simulation itself always runs
+in full.
+"""
+import numpy as np
+
+
+class FrameBudget:
+    """
+    Track frame times against a budget and choose a degradation level:
+    0 renders every element that changed, 1 also skips elements outside the
+    viewport, and each level from 2 up halves the render rate of elements
+    far from the focus point (e.g., the player).  Urgent elements are always
+    rendered.  Skipped elements stay dirty, so they are drawn on a later frame
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, budget_ms: float, max_level: int = 3, far_distance: float = 200,
+                 margin: float = 50, patience: int = 10, smoothing: float = 0.2):
+        self.__budget_ms = budget_ms
+        self.__max_level = max_level
+        self.__far_distance = far_distance
+        self.__margin = margin
+        self.__patience = patience
+        self.__smoothing = smoothing
+        self.__level = 0
+        self.__frame_ms: float = 0.0
+        self.__over = 0
+        self.__under = 0
+        self.__skipped = 0
+        self.__frames = 0  # select() calls, which pace far elements
+
+    @property
+    def budget_ms(self) -> float:
+        """
+        Get the time a frame may take, in milliseconds
+        """
+        return self.__budget_ms
+
+    @property
+    def level(self) -> int:
+        """
+        Get the current degradation level, 0 meaning no degradation
+        """
+        return self.__level
+
+    @property
+    def frame_ms(self) -> float:
+        """
+        Get the smoothed frame time in milliseconds
+        """
+        return self.__frame_ms
+
+    @property
+    def skipped(self) -> int:
+        """
+        Get the number of element renders postponed so far
+        """
+        return self.__skipped
+
+    def record(self, frame_ms: float) -> None:
+        """
+        Add the duration of a frame and step the degradation level up after
+        patience frames over budget, or down after three times as many frames
+        comfortably under it
+        """
+        self.__frame_ms += self.__smoothing * (frame_ms - self.__frame_ms)
+        if self.__frame_ms > self.__budget_ms:
+            self.__over += 1
+            self.__under = 0
+            if self.__over >= self.__patience and self.__level < self.__max_level:
+                self.__level += 1
+                self.__over = 0
+        elif self.__frame_ms < 0.6 * self.__budget_ms:
+            self.__under += 1
+            self.__over = 0
+            if self.__under >= 3 * self.__patience and self.__level > 0:
+                self.__level -= 1
+                self.__under = 0
+        else:
+            self.__over = 0
+            self.__under = 0
+
+    # pylint: disable=too-many-arguments
+    def select(self, indices: np.ndarray, xs: np.ndarray, ys: np.ndarray, urgent: np.ndarray,
+               viewport: tuple[float, float, float, float] | None,
+               focus: tuple[float, float] | None) -> np.ndarray:
+        """
+        Return the subset of the dirty element indices to render this frame,
+        given their positions, which of them are urgent, the visible area as
+        (x1, y1, x2, y2) and the focus point
+        """
+        level = self.__level
+        frame = self.__frames
+        self.__frames += 1
+        if level == 0 or not len(indices):
+            return indices
+        keep = np.ones(len(indices), dtype=bool)
+        if viewport is not None:
+            x1, y1, x2, y2 = viewport
+            margin = self.__margin
+            keep &= ((xs >= x1 - margin) & (xs <= x2 + margin)
+                     & (ys >= y1 - margin) & (ys <= y2 + margin))
+        if level >= 2 and focus is not None:
+            stride = 1 << (level - 1)
+            far = (xs - focus[0]) ** 2 + (ys - focus[1]) ** 2 > self.__far_distance ** 2
+            # spread the far elements evenly over the frames of a stride; the
+            # frame count, unlike the tick, advances by one every frame even
+            # when a frame runs several ticks
+            keep &= ~far | ((indices + frame) % stride == 0)
+        keep |= urgent
+        self.__skipped += len(indices) - int(np.count_nonzero(keep))
+        return indices[keep]
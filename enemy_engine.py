@@ -0,0 +1,339 @@
+"""
+The enemy_engine module stores the state of all enemies in contiguous NumPy
+arrays and advances every enemy of the same behaviour in one batched step.
+Enemy objects in the game are thin views onto rows of these arrays.
+"""
+import numpy as np
+from flowfield import FlowField
+from gamelib import EntityStore
+
+# behaviour types
+CHASING = 0   # heads toward a target every tick
+BOUNCING = 1  # walks straight and bounces off its bounding box
+FENCING = 2   # walks around the edges of a square
+
+# per-phase unit moves of a fencing enemy: right, down, left, up
+_FENCE_DX = np.array([1.0, 0.0, -1.0, 0.0])
+_FENCE_DY = np.array([0.0, 1.0, 0.0, -1.0])
+
+
+class EnemyEngine:
+    """
+    A struct-of-arrays store of enemy headings, speeds and behaviour types,
+    with a vectorized per-tick step for each behaviour.  Rows are indexed by
+    the enemies' EntityStore indices, whose x, y and size columns hold the
+    enemies' positions and sizes.
+    """
+
+    __columns = ("heading", "initial_heading", "speed", "initial_speed", "kind", "active",
+                 "phase", "min_x", "min_y", "max_x", "max_y", "prev_x", "prev_y")
+
+    def __init__(self, entities: EntityStore):
+        self.__entities = entities
+        self.__groups: dict[int, np.ndarray] | None = None
+        self.__rows: np.ndarray | None = None
+        self.__max_size: float = 0
+        capacity = entities.capacity
+        self.heading = np.zeros(capacity)
+        self.initial_heading = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.initial_speed = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.active = np.zeros(capacity, dtype=bool)
+        # fencing enemies: current side of the square
+        self.phase = np.zeros(capacity, dtype=np.int8)
+        # bouncing enemies: bounding box; fencing enemies: square corners
+        self.min_x = np.zeros(capacity)
+        self.min_y = np.zeros(capacity)
+        self.max_x = np.zeros(capacity)
+        self.max_y = np.zeros(capacity)
+        # positions before the last step, for swept collision tests
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        # when set, chasing enemies follow it instead of heading straight
+        # for the target
+        self.flow_field: FlowField | None = None
+
+    @property
+    def x(self) -> np.ndarray:
+        """
+        Get the x column of the underlying EntityStore
+        """
+        return self.__entities.x
+
+    @property
+    def y(self) -> np.ndarray:
+        """
+        Get the y column of the underlying EntityStore
+        """
+        return self.__entities.y
+
+    @property
+    def size(self) -> np.ndarray:
+        """
+        Get the size column of the underlying EntityStore
+        """
+        return self.__entities.size
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of active enemies
+        """
+        return len(self.rows)
+
+    @property
+    def max_size(self) -> float:
+        """
+        Get the largest size of any enemy ever configured
+        """
+        return self.__max_size
+
+    @property
+    def max_speed(self) -> float:
+        """
+        Get the highest speed of any active enemy
+        """
+        rows = self.rows
+        return float(self.speed[rows].max()) if len(rows) else 0.0
+
+    @property
+    def rows(self) -> np.ndarray:
+        """
+        Get the indices of all active rows
+        """
+        if self.__rows is None:
+            self.__rows = np.flatnonzero(self.active[:self.__entities.high_water])
+        return self.__rows
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Grow the columns to hold at least the given number of rows
+        """
+        if capacity <= len(self.active):
+            return
+        for name in self.__columns:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    # pylint: disable=too-many-arguments
+    def configure(self, row: int, kind: int, size: float, speed: float, heading: float = 0.0,
+                  bounds: tuple[float, float, float, float] = (0, 0, 0, 0)) -> None:
+        """
+        Set up an inactive row for an enemy.  bounds is (min_x, min_y, max_x,
+        max_y), used as the bounding box of bouncing enemies or the square
+        walked by fencing enemies.
+        """
+        if row >= len(self.active):
+            self.reserve(max(self.__entities.capacity, row + 1))
+        self.active[row] = False
+        self.kind[row] = kind
+        self.size[row] = size
+        self.__max_size = max(self.__max_size, size)
+        self.initial_speed[row] = speed
+        self.initial_heading[row] = heading
+        self.set_bounds(row, bounds)
+        self.reset(row)
+        self.__groups = None
+        self.__rows = None
+
+    def set_bounds(self, row: int, bounds: tuple[float, float, float, float]) -> None:
+        """
+        Set the bounding box or fencing square of a row as (min_x, min_y,
+        max_x, max_y)
+        """
+        self.min_x[row], self.min_y[row], self.max_x[row], self.max_y[row] = bounds
+
+    def reset(self, row: int) -> None:
+        """
+        Restore the movement state the row was configured with, e.g., when a
+        pooled enemy is reused
+        """
+        self.heading[row] = self.initial_heading[row]
+        self.speed[row] = self.initial_speed[row]
+        self.phase[row] = 0
+
+    def activate(self, row: int) -> None:
+        """
+        Include the row in subsequent steps
+        """
+        self.active[row] = True
+        # a newly placed enemy has not moved from anywhere
+        self.prev_x[row] = self.x[row]
+        self.prev_y[row] = self.y[row]
+        self.__groups = None
+        self.__rows = None
+
+    def deactivate(self, row: int) -> None:
+        """
+        Exclude the row from subsequent steps
+        """
+        self.active[row] = False
+        self.__groups = None
+        self.__rows = None
+
+    def __rows_by_kind(self) -> dict[int, np.ndarray]:
+        if self.__groups is None:
+            high_water = self.__entities.high_water
+            active = self.active[:high_water]
+            kinds = self.kind[:high_water]
+            self.__groups = {k: np.flatnonzero(active & (kinds == k))
+                             for k in (CHASING, BOUNCING, FENCING)}
+        return self.__groups
+
+    def hits(self, px: float, py: float, rows=None) -> bool:
+        """
+        Check whether any active enemy, or any of the given candidate rows, is
+        hitting the point (px, py).  Chasing enemies use a circular test, all
+        other kinds a square one.
+        """
+        rows = self.rows if rows is None else np.asarray(rows, dtype=np.intp)
+        if not len(rows):
+            return False
+        x, y, size = self.x[rows], self.y[rows], self.size[rows]
+        half = size / 2
+        square = (x - half < px) & (px < x + half) & (y - half < py) & (py < y + half)
+        circle = np.hypot(px - x, py - y) < size
+        return bool(np.any(np.where(self.kind[rows] == CHASING, circle, square)))
+
+    def sweep(self, x0: float, y0: float, x1: float, y1: float, rows=None) -> np.ndarray:
+        """
+        Return the active enemies, among all or the given candidate rows,
+        that touched a point moving from (x0, y0) to (x1, y1) while they
+        moved from their positions before the last step to their current
+        ones.  Both motions are taken as linear over the tick, so the test is
+        of the point's relative motion, a segment, against each enemy's
+        shape: a circle for chasing enemies and a square for all others, as
+        in hits().
+        """
+        rows = self.rows if rows is None else np.asarray(rows, dtype=np.intp)
+        return rows[self.contact_times(x0, y0, x1, y1, rows) <= 1]
+
+    def first_contact(self, x0: float, y0: float, x1: float, y1: float,
+                      rows=None) -> float | None:
+        """
+        Return the fraction of the tick, from 0 to 1, at which the point
+        moving as in sweep() first touched any enemy, or None if it did not
+        """
+        rows = self.rows if rows is None else np.asarray(rows, dtype=np.intp)
+        if not len(rows):
+            return None
+        first = float(self.contact_times(x0, y0, x1, y1, rows).min())
+        return first if first <= 1 else None
+
+    # pylint: disable=too-many-locals
+    def contact_times(self, x0: float, y0: float, x1: float, y1: float,
+                      rows: np.ndarray) -> np.ndarray:
+        """
+        Return, for each of the given rows, the fraction of the tick at which
+        the point moving as in sweep() entered the enemy's shape (0 if it was
+        already inside), or infinity if it never did
+        """
+        # relative segment from s to s + d, in each enemy's own frame
+        sx = x0 - self.prev_x[rows]
+        sy = y0 - self.prev_y[rows]
+        dx = (x1 - self.x[rows]) - sx
+        dy = (y1 - self.y[rows]) - sy
+        size = self.size[rows]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # circle: the first root of |s + t d| = size
+            a = dx * dx + dy * dy
+            b = sx * dx + sy * dy
+            c = sx * sx + sy * sy - size * size
+            disc = b * b - a * c
+            enter_circle = (-b - np.sqrt(np.maximum(disc, 0.0))) / a
+            circle = np.where(c < 0, 0.0,
+                              np.where((disc > 0) & (a > 0) & (enter_circle >= 0)
+                                       & (enter_circle <= 1), enter_circle, np.inf))
+
+            # square: slab test against the open box |x|, |y| < half
+            half = size / 2
+            enter_x, leave_x = self.__slab(sx, dx, half)
+            enter_y, leave_y = self.__slab(sy, dy, half)
+        enter = np.maximum(np.maximum(enter_x, enter_y), 0.0)
+        leave = np.minimum(np.minimum(leave_x, leave_y), 1.0)
+        square = np.where(enter < leave, enter, np.inf)
+
+        return np.where(self.kind[rows] == CHASING, circle, square)
+
+    @staticmethod
+    def __slab(start: np.ndarray, delta: np.ndarray,
+               half: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # the parameter interval in which start + t * delta lies in (-half, half)
+        t1 = (-half - start) / delta
+        t2 = (half - start) / delta
+        inside = np.abs(start) < half
+        still = delta == 0
+        enter = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+        leave = np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+        return enter, leave
+
+    def step(self, target_x: float, target_y: float) -> None:
+        """
+        Advance every active enemy by one tick; chasing enemies move toward
+        (target_x, target_y)
+        """
+        groups = self.__rows_by_kind()
+        rows = self.rows
+        self.prev_x[rows] = self.x[rows]
+        self.prev_y[rows] = self.y[rows]
+        self.__step_chasing(groups[CHASING], target_x, target_y)
+        self.__step_bouncing(groups[BOUNCING])
+        self.__step_fencing(groups[FENCING])
+        # every active enemy moves each tick
+        self.__entities.set_flags(rows, EntityStore.DIRTY)
+
+    def __step_chasing(self, rows: np.ndarray, target_x: float, target_y: float) -> None:
+        if not len(rows):
+            return
+        field = self.flow_field
+        if field is None:
+            angle = np.arctan2(target_y - self.y[rows], target_x - self.x[rows])
+            self.heading[rows] = angle
+            self.x[rows] += self.speed[rows] * np.cos(angle)
+            self.y[rows] += self.speed[rows] * np.sin(angle)
+            return
+        field.update(target_x, target_y)
+        x, y = self.x[rows], self.y[rows]
+        angle, cos, sin, near = field.sample(x, y)
+        if near.any():
+            # close to the target, aim at the target itself
+            close = np.arctan2(target_y - y[near], target_x - x[near])
+            angle[near] = close
+            cos[near] = np.cos(close)
+            sin[near] = np.sin(close)
+        speed = self.speed[rows]
+        self.heading[rows] = angle
+        self.x[rows] = x + speed * cos
+        self.y[rows] = y + speed * sin
+
+    def __step_bouncing(self, rows: np.ndarray) -> None:
+        if not len(rows):
+            return
+        angle = self.heading[rows]
+        x = self.x[rows] + self.speed[rows] * np.cos(angle)
+        y = self.y[rows] + self.speed[rows] * np.sin(angle)
+        self.x[rows] = x
+        self.y[rows] = y
+        out_x = (x < self.min_x[rows]) | (x > self.max_x[rows])
+        out_y = (y < self.min_y[rows]) | (y > self.max_y[rows])
+        angle = np.where(out_x, np.pi - angle, angle)
+        self.heading[rows] = np.where(out_y, -angle, angle)
+
+    def __step_fencing(self, rows: np.ndarray) -> None:
+        if not len(rows):
+            return
+        phase = self.phase[rows]
+        speed = self.speed[rows]
+        x = self.x[rows] + speed * _FENCE_DX[phase]
+        y = self.y[rows] + speed * _FENCE_DY[phase]
+        self.x[rows] = x
+        self.y[rows] = y
+        turn = (((phase == 0) & (x >= self.max_x[rows]))
+                | ((phase == 1) & (y >= self.max_y[rows]))
+                | ((phase == 2) & (x <= self.min_x[rows]))
+                | ((phase == 3) & (y <= self.min_y[rows])))
+        self.phase[rows] = np.where(turn, (phase + 1) % 4, phase)
@@ -0,0 +1,197 @@
+"""
+The flowfield module provides FlowField, a distance map toward a target over
+a coarse grid of the play area.  The map is recomputed only when the target
+enters another cell, and any number of chasers then find their way by
+looking up the direction stored for the cell they are in.
+"""
+import heapq
+import math
+
+import numpy as np
+
+_SQRT2 = math.sqrt(2)
+# the eight neighbours of a cell as (row offset, column offset, step cost)
+_NEIGHBOURS = tuple((dr, dc, _SQRT2 if dr and dc else 1.0)
+                    for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+
+
+class FlowField:
+    """
+    A grid of cells covering a width x height area, each holding its path
+    distance to the target's cell and the direction in which to leave it.
+    Cells can be blocked, in which case paths go around them; where a cell's
+    path is not a detour, its direction points straight at the target.  That
+    direction is aimed from the cell's centre at where the target was when
+    the field was last updated, so a chaser in the open follows the direct
+    path only approximately and drifts from it by a pixel or two over a
+    chase
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float = 20):
+        self.__cell_size = cell_size
+        self.__cols = max(1, math.ceil(width / cell_size))
+        self.__rows = max(1, math.ceil(height / cell_size))
+        shape = (self.__rows, self.__cols)
+        self.__blocked = np.zeros(shape, dtype=bool)
+        self.__distance = np.full(shape, np.inf)
+        self.__angle = np.zeros(shape)
+        self.__cos = np.zeros(shape)
+        self.__sin = np.zeros(shape)
+        self.__near = np.zeros(shape, dtype=bool)
+        self.__target_cell: tuple[int, int] | None = None
+        self.__updates = 0
+
+    @property
+    def cell_size(self) -> float:
+        """
+        Get the side length of a cell
+        """
+        return self.__cell_size
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Get the number of cell rows and columns
+        """
+        return self.__rows, self.__cols
+
+    @property
+    def distance(self) -> np.ndarray:
+        """
+        Get the path distance, in cells, from each cell to the target's cell;
+        unreachable and blocked cells hold infinity
+        """
+        return self.__distance
+
+    @property
+    def updates(self) -> int:
+        """
+        Get the number of times the field has been recomputed
+        """
+        return self.__updates
+
+    def block_rect(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        """
+        Block every cell overlapping the rectangle; the field is recomputed
+        on the next update
+        """
+        c1, r1 = self.cell_of(x1, y1)
+        c2, r2 = self.cell_of(x2, y2)
+        self.__blocked[r1:r2 + 1, c1:c2 + 1] = True
+        self.__target_cell = None
+
+    def clear_blocks(self) -> None:
+        """
+        Unblock all cells
+        """
+        self.__blocked[:] = False
+        self.__target_cell = None
+
+    def cell_of(self, x: float, y: float) -> tuple[int, int]:
+        """
+        Get the (column, row) of the cell containing (x, y), clamped to the
+        grid
+        """
+        col = min(max(int(x // self.__cell_size), 0), self.__cols - 1)
+        row = min(max(int(y // self.__cell_size), 0), self.__rows - 1)
+        return col, row
+
+    def update(self, target_x: float, target_y: float) -> bool:
+        """
+        Recompute the field toward (target_x, target_y) if the target is in
+        another cell than last time.  Return whether it was recomputed.
+        """
+        cell = self.cell_of(target_x, target_y)
+        if cell == self.__target_cell:
+            return False
+        self.__target_cell = cell
+        self.__updates += 1
+        col, row = cell
+        if self.__blocked.any():
+            self.__distance = self.__search(row, col)
+        else:
+            self.__distance = self.__octile(row, col)
+        self.__compute_directions(row, col, target_x, target_y)
+        return True
+
+    def __octile(self, row: int, col: int) -> np.ndarray:
+        # without obstacles, the 8-way path distance has a closed form
+        dr = np.abs(np.arange(self.__rows) - row)[:, None]
+        dc = np.abs(np.arange(self.__cols) - col)[None, :]
+        return np.maximum(dr, dc) + (_SQRT2 - 1) * np.minimum(dr, dc)
+
+    def __search(self, row: int, col: int) -> np.ndarray:
+        # Dijkstra over the 8-connected free cells, without cutting corners
+        blocked = self.__blocked
+        rows, cols = self.__rows, self.__cols
+        distance = np.full((rows, cols), np.inf)
+        if blocked[row, col]:
+            return distance
+        dist = distance.tolist()
+        dist[row][col] = 0.0
+        free = (~blocked).tolist()
+        queue = [(0.0, row, col)]
+        while queue:
+            d, r, c = heapq.heappop(queue)
+            if d > dist[r][c]:
+                continue
+            for dr, dc, cost in _NEIGHBOURS:
+                nr, nc = r + dr, c + dc
+                if not (0 <= nr < rows and 0 <= nc < cols and free[nr][nc]):
+                    continue
+                if dr and dc and not (free[r][nc] and free[nr][c]):
+                    continue
+                nd = d + cost
+                if nd < dist[nr][nc]:
+                    dist[nr][nc] = nd
+                    heapq.heappush(queue, (nd, nr, nc))
+        return np.array(dist)
+
+    def __compute_directions(self, row: int, col: int, target_x: float, target_y: float) -> None:
+        distance = self.__distance
+        padded = np.pad(distance, 1, constant_values=np.inf)
+        blocked = np.pad(self.__blocked, 1, constant_values=True)
+        rows, cols = self.__rows, self.__cols
+        best = distance.copy()
+        step_r = np.zeros((rows, cols))
+        step_c = np.zeros((rows, cols))
+        for dr, dc, _ in _NEIGHBOURS:
+            neighbour = padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+            if dr and dc:
+                # a diagonal step needs both cells beside it to be free
+                corner_free = ~(blocked[1 + dr:1 + dr + rows, 1:1 + cols]
+                                | blocked[1:1 + rows, 1 + dc:1 + dc + cols])
+                neighbour = np.where(corner_free, neighbour, np.inf)
+            better = neighbour < best
+            best = np.where(better, neighbour, best)
+            step_r = np.where(better, dr, step_r)
+            step_c = np.where(better, dc, step_c)
+        angle = np.arctan2(step_r, step_c)
+
+        # cells whose path is not a detour head straight for the target
+        size = self.__cell_size
+        centre_y = (np.arange(rows)[:, None] + 0.5) * size
+        centre_x = (np.arange(cols)[None, :] + 0.5) * size
+        straight = distance <= self.__octile(row, col) + 1e-9
+        direct = np.arctan2(target_y - centre_y, target_x - centre_x)
+        angle = np.where(straight, direct, angle)
+        angle[row, col] = 0.0
+        self.__angle = angle
+        self.__cos = np.cos(angle)
+        self.__sin = np.sin(angle)
+        self.__near = distance < 1.5
+
+    def sample(self, xs: np.ndarray, ys: np.ndarray) -> tuple[np.ndarray, np.ndarray,
+                                                               np.ndarray, np.ndarray]:
+        """
+        Look up the direction to move in from each of the given positions.
+        Return the angles and their cosines and sines, and a mask of the
+        positions in or next to the target's cell, which should head for the
+        target itself instead
+        """
+        scale = 1 / self.__cell_size
+        cols = np.clip((xs * scale).astype(np.intp), 0, self.__cols - 1)
+        rows = np.clip((ys * scale).astype(np.intp), 0, self.__rows - 1)
+        cells = rows * self.__cols + cols
+        return (self.__angle.take(cells), self.__cos.take(cells), self.__sin.take(cells),
+                self.__near.take(cells))
@@ -2,42 +2,190 @@
 The gamelib module defines abstract classes necessary for implementing simple
 games based on tkinter's canvas.
 """
+import heapq
+import itertools
+import time
 import tkinter as tk
 from abc import ABC, abstractmethod
+import numpy as np
+from budget import FrameBudget
+from profiling import FrameProfiler, UPDATE, RENDER
+
+
+class EntityStore:
+    """
+    A struct-of-arrays store holding the position, size and flags of every
+    game element in NumPy columns, so that whole-world operations, e.g.,
+    finding the elements to render, work on columns instead of objects
+    """
+
+    ACTIVE = 1  # the element has been added to the game
+    DIRTY = 2   # the element changed since it was last rendered
+    URGENT = 4  # render as soon as dirty, even when the frame budget is degraded
+
+    __columns = ("x", "y", "size", "flags")
+
+    def __init__(self, capacity: int = 64):
+        self.__size = 0
+        self.__free: list[int] = []
+        self.__owners: list["GameElement | None"] = []
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Get the number of rows currently allocated
+        """
+        return len(self.x)
+
+    @property
+    def high_water(self) -> int:
+        """
+        Get one past the highest index ever handed out
+        """
+        return self.__size
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Grow the columns to hold at least the given number of rows
+        """
+        if capacity <= self.capacity:
+            return
+        for name in self.__columns:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def allocate(self, owner: "GameElement") -> int:
+        """
+        Reserve a row for the given element and return its index
+        """
+        if self.__free:
+            index = self.__free.pop()
+            self.__owners[index] = owner
+        else:
+            if self.__size == self.capacity:
+                self.reserve(2 * self.capacity)
+            index = self.__size
+            self.__size += 1
+            self.__owners.append(owner)
+        self.x[index] = 0
+        self.y[index] = 0
+        self.size[index] = 0
+        self.flags[index] = self.DIRTY
+        return index
+
+    def release(self, index: int) -> None:
+        """
+        Make a row available for reuse by another element
+        """
+        self.flags[index] = 0
+        self.__owners[index] = None
+        self.__free.append(index)
+
+    def owner(self, index: int) -> "GameElement":
+        """
+        Get the element stored at the given index
+        """
+        return self.__owners[index]
+
+    def indices_with(self, flags: int) -> np.ndarray:
+        """
+        Get the indices of all rows having all the given flags set
+        """
+        column = self.flags[:self.__size]
+        return np.flatnonzero((column & flags) == flags)
+
+    def set_flags(self, indices, flags: int) -> None:
+        """
+        Set the given flags on all given rows at once
+        """
+        self.flags[indices] |= flags
+
+    def clear_flags(self, indices, flags: int) -> None:
+        """
+        Clear the given flags on all given rows at once
+        """
+        self.flags[indices] &= ~np.uint8(flags)
 
 
 class GameElement(ABC):
     """
     An abstract class to be implemented to represent all kinds of elements to
-    be displayed on the game's screen
+    be displayed on the game's screen.  The element's coordinates and flags
+    live in a row of the game's EntityStore.
     """
 
+    __slots__ = ("__game", "__entities", "__index")
+
     def __init__(self, game: "Game"):
         self.__game: "Game" = game
-        self.__x: float = 0
-        self.__y: float = 0
+        self.__entities: EntityStore = game.entities
+        self.__index: int = self.__entities.allocate(self)
+
+    @property
+    def index(self) -> int:
+        """
+        Get the index of the element's row in the game's EntityStore
+        """
+        return self.__index
 
     @property
     def x(self) -> float:
         """
         Get or set the x coordinate of the element
         """
-        return self.__x
+        return float(self.__entities.x[self.__index])
 
     @x.setter
     def x(self, val: float) -> None:
-        self.__x = val
+        entities = self.__entities
+        entities.x[self.__index] = val
+        entities.flags[self.__index] |= EntityStore.DIRTY
 
     @property
     def y(self) -> float:
         """
         Get or set the y coordinate of the element
         """
-        return self.__y
+        return float(self.__entities.y[self.__index])
 
     @y.setter
     def y(self, val: float) -> None:
-        self.__y = val
+        entities = self.__entities
+        entities.y[self.__index] = val
+        entities.flags[self.__index] |= EntityStore.DIRTY
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        Get the flag indicating whether the element has changed since it was
+        last rendered
+        """
+        return bool(self.__entities.flags[self.__index] & EntityStore.DIRTY)
+
+    def mark_dirty(self) -> None:
+        """
+        Request the element to be rendered in the next frame
+        """
+        self.__entities.flags[self.__index] |= EntityStore.DIRTY
+
+    def clear_dirty(self) -> None:
+        """
+        Mark the element as up to date with its canvas representation
+        """
+        self.__entities.clear_flags(self.__index, EntityStore.DIRTY)
+
+    def free_entity(self) -> None:
+        """
+        Give the element's EntityStore row back for reuse; the element must
+        not be used afterwards
+        """
+        self.__entities.release(self.__index)
 
     @property
     def game(self) -> "Game":
@@ -77,6 +225,298 @@ class GameElement(ABC):
         Delete the corresponding game object, e.g., canvas item
         """
 
+    def detach(self) -> None:
+        """
+        Take the element out of the game's whole-world systems, e.g.,
+        batched movement.  Called as soon as the element is deleted from the
+        game, whereas delete() may wait until the end of the tick
+        """
+
+
+class ElementRegistry:
+    """
+    An ordered collection of game elements with O(1) add and remove.  Removed
+    elements leave a hole in place, so removing an element while iterating
+    neither skips nor repeats other elements; holes are compacted away by
+    compact(), which must not be called during iteration.
+    """
+
+    def __init__(self):
+        self.__slots: list[GameElement | None] = []
+        self.__index: dict[GameElement, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def __contains__(self, element: GameElement) -> bool:
+        return element in self.__index
+
+    def __iter__(self):
+        # index-based so that elements added during iteration are visited
+        slots = self.__slots
+        i = 0
+        while i < len(slots):
+            element = slots[i]
+            if element is not None:
+                yield element
+            i += 1
+
+    def add(self, element: GameElement) -> None:
+        """
+        Append an element at the end of the iteration order
+        """
+        self.__index[element] = len(self.__slots)
+        self.__slots.append(element)
+
+    def remove(self, element: GameElement) -> None:
+        """
+        Remove an element, leaving a hole in its slot
+        """
+        self.__slots[self.__index.pop(element)] = None
+
+    def compact(self) -> None:
+        """
+        Drop the holes once they make up more than half of the slots
+        """
+        if len(self.__slots) > 2 * len(self.__index):
+            self.__slots = [e for e in self.__slots if e is not None]
+            self.__index = {e: i for i, e in enumerate(self.__slots)}
+
+
+class HeadlessCanvas:
+    """
+    A canvas-compatible stand-in that records item operations without drawing
+    anything, so that games can be simulated without a display server
+    """
+
+    def __init__(self):
+        self.__next_id = itertools.count(1)
+        self.__items: dict[int, dict] = {}
+        self.__bindings: dict[str, object] = {}
+        self.__options: dict[str, object] = {}
+        self.__call_count: int = 0
+
+    @property
+    def call_count(self) -> int:
+        """
+        Get the number of canvas operations issued so far
+        """
+        return self.__call_count
+
+    @property
+    def bindings(self) -> dict[str, object]:
+        """
+        Get the event handlers registered through bind()
+        """
+        return self.__bindings
+
+    def __create(self, kind: str, coords: tuple, options: dict) -> int:
+        self.__call_count += 1
+        item_id = next(self.__next_id)
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = coords[0]
+        self.__items[item_id] = {"type": kind,
+                                 "coords": [float(c) for c in coords],
+                                 "options": dict(options)}
+        return item_id
+
+    def create_line(self, *coords, **options) -> int:
+        """
+        Record creation of a line item
+        """
+        return self.__create("line", coords, options)
+
+    def create_oval(self, *coords, **options) -> int:
+        """
+        Record creation of an oval item
+        """
+        return self.__create("oval", coords, options)
+
+    def create_rectangle(self, *coords, **options) -> int:
+        """
+        Record creation of a rectangle item
+        """
+        return self.__create("rectangle", coords, options)
+
+    def create_polygon(self, *coords, **options) -> int:
+        """
+        Record creation of a polygon item
+        """
+        return self.__create("polygon", coords, options)
+
+    def create_text(self, *coords, **options) -> int:
+        """
+        Record creation of a text item
+        """
+        return self.__create("text", coords, options)
+
+    def coords(self, item_id: int, *coords) -> list[float]:
+        """
+        Get or set the coordinates of an item
+        """
+        self.__call_count += 1
+        item = self.__items.get(item_id)
+        if item is None:
+            return []
+        if coords:
+            if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+                coords = coords[0]
+            item["coords"] = [float(c) for c in coords]
+        return list(item["coords"])
+
+    def coords_batch(self, changes: dict[int, tuple]) -> None:
+        """
+        Set the coordinates of many items in a single operation
+        """
+        self.__call_count += 1
+        for item_id, coords in changes.items():
+            item = self.__items.get(item_id)
+            if item is not None:
+                item["coords"] = [float(c) for c in coords]
+
+    def itemconfigure(self, item_id: int, **options) -> None:
+        """
+        Record a change of item options
+        """
+        self.__call_count += 1
+        item = self.__items.get(item_id)
+        if item is not None:
+            item["options"].update(options)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, item_id: int, option: str):
+        """
+        Get the value of an item option
+        """
+        self.__call_count += 1
+        return self.__items[item_id]["options"].get(option, "")
+
+    def type(self, item_id: int):
+        """
+        Get the type of an item, or None if it does not exist
+        """
+        item = self.__items.get(item_id)
+        return None if item is None else item["type"]
+
+    def find_all(self) -> tuple[int, ...]:
+        """
+        Get the ids of all existing items
+        """
+        return tuple(self.__items)
+
+    def tag_raise(self, item_id: int, *_) -> None:
+        """
+        Record raising of an item (stacking order is not modeled)
+        """
+        self.__call_count += 1
+
+    def tag_lower(self, item_id: int, *_) -> None:
+        """
+        Record lowering of an item (stacking order is not modeled)
+        """
+        self.__call_count += 1
+
+    def delete(self, *item_ids) -> None:
+        """
+        Delete the given items
+        """
+        self.__call_count += 1
+        for item_id in item_ids:
+            self.__items.pop(item_id, None)
+
+    def bind(self, sequence: str, func=None, *_) -> None:
+        """
+        Register an event handler
+        """
+        self.__bindings[sequence] = func
+
+    def unbind(self, sequence: str, *_) -> None:
+        """
+        Remove an event handler
+        """
+        self.__bindings.pop(sequence, None)
+
+    def configure(self, **options) -> None:
+        """
+        Record canvas options such as width and height
+        """
+        self.__options.update(options)
+
+    config = configure
+
+    def cget(self, option: str):
+        """
+        Get the value of a canvas option
+        """
+        return self.__options.get(option, "")
+
+    def pack(self, *_, **__) -> None:
+        """
+        Ignore geometry management
+        """
+
+
+class RenderBatcher:
+    """
+    Collect canvas coordinate changes made during the render phase and send
+    them to Tcl as a few composite calls instead of one round-trip per item
+    """
+
+    BATCH_PROC = ("proc ::gamelib_batch_coords {canvas data} {"
+                  " foreach {item coords} $data { $canvas coords $item {*}$coords } }")
+
+    def __init__(self, canvas: "tk.Canvas | HeadlessCanvas", chunk_size: int = 1000):
+        self.__canvas = canvas
+        self.__chunk_size = chunk_size
+        self.__pending: dict[int, tuple] = {}
+        self.__proc_defined = False
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of items with coordinate changes not flushed yet
+        """
+        return len(self.__pending)
+
+    def coords(self, item_id: int, *coords) -> None:
+        """
+        Queue new coordinates for an item; a later change to the same item
+        replaces an earlier one
+        """
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = tuple(coords[0])
+        self.__pending[item_id] = coords
+
+    def flush(self) -> int:
+        """
+        Apply all queued changes and return the number of calls into the
+        canvas this took
+        """
+        pending = self.__pending
+        if not pending:
+            return 0
+        self.__pending = {}
+        canvas = self.__canvas
+        if isinstance(canvas, HeadlessCanvas):
+            canvas.coords_batch(pending)
+            return 1
+        if not self.__proc_defined:
+            canvas.tk.eval(self.BATCH_PROC)
+            self.__proc_defined = True
+        # the data goes as a Tcl list object, so no float is formatted as text
+        path = str(canvas)
+        items = list(pending.items())
+        calls = 0
+        for start in range(0, len(items), self.__chunk_size):
+            data = []
+            for item_id, coords in items[start:start + self.__chunk_size]:
+                data.append(item_id)
+                data.append(coords)
+            canvas.tk.call("::gamelib_batch_coords", path, tuple(data))
+            calls += 1
+        return calls
+
 
 class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
     """
@@ -84,13 +524,34 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
     on update/render loop
     """
 
-    def __init__(self, parent, update_delay=33):
-        super().__init__(parent)
-        self.__canvas = tk.Canvas(self)
-        self.__canvas.pack(expand=True, fill="both")
-        self.pack(expand=True, fill="both")
-        self.__game_elements = []
+    def __init__(self, parent, update_delay=33, headless=False, max_steps_per_frame=5):
+        self.__headless = headless
+        if headless:
+            # no Tk widget is created, so parent may be None
+            self.__canvas = HeadlessCanvas()
+        else:
+            super().__init__(parent)
+            self.__canvas = tk.Canvas(self)
+            self.__canvas.pack(expand=True, fill="both")
+            self.pack(expand=True, fill="both")
+        self.__timers: list[tuple[int, int, str, object, tuple]] = []
+        self.__cancelled_timers: set[str] = set()
+        self.__timer_seq = itertools.count()
+        self.__clock: int = 0
+        self.__tick: int = 0
+        self.__entities = EntityStore()
+        self.__render_batcher = RenderBatcher(self.__canvas)
+        self.__game_elements = ElementRegistry()
+        self.__pending_deletes: list[GameElement] = []
+        self.__in_tick = False
+        self.__profiler: FrameProfiler | None = None
+        self.__overlay_interval: int = 0
+        self.__frame_budget: FrameBudget | None = None
         self.__update_delay = update_delay
+        self.__max_steps_per_frame = max_steps_per_frame
+        self.__accumulator: float = 0
+        self.__last_frame_time: float = 0
+        self.__frame_timer = None
         self.__started = False
         self.init_game()
 
@@ -112,19 +573,48 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         Get called when the player loses the game
         """
 
+    def post_update(self) -> None:
+        """
+        Get called once per tick after all elements have been updated; games
+        may override it to run whole-world systems, e.g., batched movement
+        """
+
     def add_element(self, element: GameElement) -> None:
         """
         Add a GameElement object to the game
         """
         element.create()
-        self.__game_elements.append(element)
+        self.__game_elements.add(element)
+        self.__entities.set_flags(element.index, EntityStore.ACTIVE | EntityStore.DIRTY)
 
     def delete_element(self, element: GameElement) -> None:
         """
-        Remove a GameElement object to the game
+        Remove a GameElement object from the game.  The element is detached
+        at once, so when called during a tick it stops being updated,
+        rendered, moved and collided with in that tick already, while
+        deleting its game object is deferred until the tick is over.
         """
-        element.delete()
         self.__game_elements.remove(element)
+        self.__entities.clear_flags(element.index, EntityStore.ACTIVE)
+        element.detach()
+        if self.__in_tick:
+            self.__pending_deletes.append(element)
+        else:
+            element.delete()
+
+    def __flush_deletes(self) -> None:
+        pending = self.__pending_deletes
+        self.__pending_deletes = []
+        for element in pending:
+            element.delete()
+        self.__game_elements.compact()
+
+    @property
+    def element_count(self) -> int:
+        """
+        Get the number of elements in the game
+        """
+        return len(self.__game_elements)
 
     @property
     def canvas(self) -> tk.Canvas:
@@ -133,6 +623,57 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         """
         return self.__canvas
 
+    @property
+    def render_batcher(self) -> RenderBatcher:
+        """
+        Get the batcher through which elements queue coordinate changes
+        during the render phase; the queue is flushed once per frame
+        """
+        return self.__render_batcher
+
+    @property
+    def entities(self) -> EntityStore:
+        """
+        Get the store holding the coordinates and flags of all elements
+        """
+        return self.__entities
+
+    @property
+    def is_headless(self) -> bool:
+        """
+        Get the flag indicating whether the game runs without a display
+        """
+        return self.__headless
+
+    @property
+    def clock(self) -> int:
+        """
+        Get the simulated time in milliseconds (headless mode only)
+        """
+        return self.__clock
+
+    @property
+    def tick(self) -> int:
+        """
+        Get the number of update ticks executed so far
+        """
+        return self.__tick
+
+    @property
+    def in_tick(self) -> bool:
+        """
+        Get the flag indicating whether a tick is being run, e.g., when
+        called from an element's update() or from post_update()
+        """
+        return self.__in_tick
+
+    @property
+    def update_delay(self) -> int:
+        """
+        Get the fixed simulation timestep in milliseconds
+        """
+        return self.__update_delay
+
     @property
     def is_started(self) -> bool:
         """
@@ -146,6 +687,9 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         """
         if not self.__started:
             self.__started = True
+            self.__last_frame_time = self.now()
+            # make the first frame run a tick immediately
+            self.__accumulator = self.__update_delay
             self.animate()
 
     def stop(self) -> None:
@@ -153,13 +697,217 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         Stop the game
         """
         self.__started = False
+        if self.__frame_timer is not None:
+            # so that a later start() does not run two loops at once
+            self.after_cancel(self.__frame_timer)
+            self.__frame_timer = None
+
+    def now(self) -> float:
+        """
+        Get the current time in milliseconds, taken from the simulated clock in
+        headless mode and from a monotonic wall clock otherwise
+        """
+        if self.__headless:
+            return self.__clock
+        return time.perf_counter() * 1000
+
+    def after(self, ms, func=None, *args):
+        """
+        Schedule func to be called after the given delay in milliseconds.  In
+        headless mode the call is queued on a simulated clock instead of Tk's
+        event loop.
+        """
+        if not self.__headless:
+            return super().after(ms, func, *args)
+        seq = next(self.__timer_seq)
+        timer_id = f"after#{seq}"
+        heapq.heappush(self.__timers, (self.__clock + int(ms), seq, timer_id, func, args))
+        return timer_id
+
+    def after_cancel(self, id):  # pylint: disable=redefined-builtin
+        """
+        Cancel a call scheduled with after()
+        """
+        if not self.__headless:
+            super().after_cancel(id)
+        else:
+            self.__cancelled_timers.add(id)
+
+    def run_headless(self, ticks: int | None = None) -> int:
+        """
+        Run the game loop and other scheduled callbacks as fast as possible,
+        advancing the simulated clock, until the game stops or the given
+        number of ticks has elapsed.  Return the number of ticks executed.
+        """
+        if not self.__headless:
+            raise RuntimeError("run_headless() requires a game created with headless=True")
+        start_tick = self.__tick
+        while self.__timers and (ticks is None or self.__tick - start_tick < ticks):
+            due, _, timer_id, func, args = heapq.heappop(self.__timers)
+            if timer_id in self.__cancelled_timers:
+                self.__cancelled_timers.discard(timer_id)
+                continue
+            self.__clock = max(self.__clock, due)
+            func(*args)
+        return self.__tick - start_tick
 
     def animate(self):
         """
-        Update and render all game's elements
+        Advance the simulation by as many fixed timesteps as the elapsed time
+        calls for (at most max_steps_per_frame), render the game's elements
+        that changed, then schedule the next frame for when the next tick is due
         """
+        self.__frame_timer = None
+        wall_start = time.perf_counter()
+        frame_start = self.now()
+        self.__accumulator += frame_start - self.__last_frame_time
+        self.__last_frame_time = frame_start
+
+        steps = 0
+        while (self.__started and self.__accumulator >= self.__update_delay
+               and steps < self.__max_steps_per_frame):
+            self.update_elements()
+            self.__accumulator -= self.__update_delay
+            steps += 1
+        if steps == self.__max_steps_per_frame:
+            # too far behind; drop the backlog instead of spiralling
+            self.__accumulator = min(self.__accumulator, self.__update_delay)
+
+        if steps:
+            self.render_elements()
+            if self.__frame_budget is not None:
+                self.__frame_budget.record((time.perf_counter() - wall_start) * 1000)
+
+        if self.__started:
+            spent = self.now() - frame_start
+            delay = self.__update_delay - self.__accumulator - spent
+            self.__frame_timer = self.after(max(0, round(delay)), self.animate)
+
+    def update_elements(self) -> None:
+        """
+        Advance all game's elements by one tick
+        """
+        self.__tick += 1
+        self.__in_tick = True
+        try:
+            if self.__profiler is None:
+                for element in self.__game_elements:
+                    element.update()
+                self.post_update()
+            else:
+                self.__profiled_update(self.__profiler)
+        finally:
+            self.__in_tick = False
+        self.__flush_deletes()
+
+    def __profiled_update(self, profiler: FrameProfiler) -> None:
+        clock = time.perf_counter_ns
         for element in self.__game_elements:
+            start = clock()
             element.update()
+            profiler.record(UPDATE, type(element).__name__, clock() - start)
+        start = clock()
+        self.post_update()
+        profiler.record(UPDATE, "post_update", clock() - start)
+        profiler.commit(UPDATE)
+
+    def render_elements(self) -> None:
+        """
+        Render the game's elements that changed since the last frame
+        """
+        entities = self.__entities
+        dirty = entities.indices_with(EntityStore.ACTIVE | EntityStore.DIRTY)
+        budget = self.__frame_budget
+        if budget is not None and budget.level:
+            dirty = budget.select(dirty, entities.x[dirty], entities.y[dirty],
+                                  (entities.flags[dirty] & EntityStore.URGENT) != 0,
+                                  self.viewport(), self.render_focus())
+        profiler = self.__profiler
+        if profiler is None:
+            for index in dirty.tolist():
+                entities.owner(index).render()
+            entities.clear_flags(dirty, EntityStore.DIRTY)
+            self.__render_batcher.flush()
+            return
+
+        clock = time.perf_counter_ns
+        for index in dirty.tolist():
+            element = entities.owner(index)
+            start = clock()
             element.render()
-        if self.__started:
-            self.after(self.__update_delay, self.animate)
+            profiler.record(RENDER, type(element).__name__, clock() - start)
+        entities.clear_flags(dirty, EntityStore.DIRTY)
+        start = clock()
+        self.__render_batcher.flush()
+        profiler.record(RENDER, "flush", clock() - start)
+        profiler.commit(RENDER)
+        if self.__overlay_interval and self.__tick % self.__overlay_interval == 0:
+            profiler.render_overlay(self.canvas)
+
+    def viewport(self) -> tuple[float, float, float, float] | None:
+        """
+        Get the visible area as (x1, y1, x2, y2), or None if unknown; a
+        degraded frame budget skips rendering elements outside it
+        """
+        return None
+
+    def render_focus(self) -> tuple[float, float] | None:
+        """
+        Get the point the player is looking at, or None if there is none; a
+        degraded frame budget renders elements far from it less often
+        """
+        return None
+
+    @property
+    def frame_budget(self) -> FrameBudget | None:
+        """
+        Get the frame budget manager, or None if frame budgeting is disabled
+        """
+        return self.__frame_budget
+
+    def enable_frame_budget(self, budget_ms: float | None = None, **options) -> FrameBudget:
+        """
+        Start measuring frame times against a budget, by default the update
+        delay, and cut rendering work while frames run over it.  options are
+        passed on to FrameBudget
+        """
+        if budget_ms is None:
+            budget_ms = self.__update_delay
+        self.__frame_budget = FrameBudget(budget_ms, **options)
+        return self.__frame_budget
+
+    def disable_frame_budget(self) -> None:
+        """
+        Stop frame budgeting and render every changed element again
+        """
+        self.__frame_budget = None
+
+    @property
+    def profiler(self) -> FrameProfiler | None:
+        """
+        Get the profiler collecting per-phase timings, or None if profiling is
+        disabled
+        """
+        return self.__profiler
+
+    def enable_profiling(self, window: int = 120, overlay: bool = False,
+                         overlay_interval: int = 10) -> FrameProfiler:
+        """
+        Start timing the update and render phase of each element class per
+        tick over a rolling window of ticks.  With overlay, FPS, tick time and
+        the top three element classes are drawn on the canvas every
+        overlay_interval ticks.
+        """
+        if self.__profiler is None:
+            self.__profiler = FrameProfiler(window)
+        self.__overlay_interval = overlay_interval if overlay else 0
+        return self.__profiler
+
+    def disable_profiling(self) -> None:
+        """
+        Stop profiling and remove the overlay, if any
+        """
+        if self.__profiler is not None:
+            self.__profiler.remove_overlay(self.canvas)
+        self.__profiler = None
+        self.__overlay_interval = 0
@@ -1,19 +1,56 @@
 """
 The main module, responsible for creating a root window containing the game's
 main component.
+
+Usage: python main.py [--level N] [--seed N] [--record SESSION_FILE]
 """
+import argparse
 from typing import Final
 import tkinter as tk
 from turtle_adventure import TurtleAdventureGame
+from replay import Recording
 
 SCREEN_WIDTH: Final = 800
 SCREEN_HEIGHT: Final = 500
 
+
+def seed_arg(text: str) -> int:
+    """
+    Parse a --seed value, which must fit the unsigned 64-bit field of a
+    recording.
+    """
+    seed = int(text)
+    if not 0 <= seed < 2 ** 64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and 2**64 - 1, got {seed}")
+    return seed
+
+
+def level_arg(text: str) -> int:
+    """
+    Parse a --level value, which must fit the unsigned 16-bit field of a
+    recording.
+    """
+    level = int(text)
+    if not 0 <= level < 2 ** 16:
+        raise argparse.ArgumentTypeError(f"level must be between 0 and 65535, got {level}")
+    return level
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turtle's Adventure")
+    parser.add_argument("--level", type=level_arg, default=1, help="level to play")
+    parser.add_argument("--seed", type=seed_arg, default=None, help="seed of the game's randomness")
+    parser.add_argument("--record", metavar="SESSION_FILE", default=None,
+                        help="record the clicks of this session for replay.py")
+    args = parser.parse_args()
+
     root = tk.Tk()
     root.title("Turtle's Adventure")
     root.geometry(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}")
     root.resizable(False, False) # games usually have fixed window size
-    game = TurtleAdventureGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=1)
+    game = TurtleAdventureGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=args.level, seed=args.seed)
+    recording = Recording.attach(game) if args.record else None
     game.start()
     root.mainloop()
+    if recording is not None:
+        recording.save(args.record)
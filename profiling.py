@@ -0,0 +1,137 @@
+"""
+The profiling module provides FrameProfiler, an opt-in instrumentation
+surface for Game that times the update and render phase of each element
+class per tick and keeps rolling statistics of the most recent ticks.
+"""
+import time
+from collections import defaultdict, deque
+
+UPDATE = "update"
+RENDER = "render"
+
+
+class FrameProfiler:
+    """
+    Collect per-tick durations, in nanoseconds, for each (phase, element
+    class) pair over a rolling window of recent ticks
+    """
+
+    def __init__(self, window: int = 120):
+        self.__window = window
+        self.__current: dict[tuple[str, str], int] = defaultdict(int)
+        self.__samples: dict[tuple[str, str], deque[int]] = {}
+        self.__phase_totals = {UPDATE: deque(maxlen=window), RENDER: deque(maxlen=window)}
+        self.__frame_times: deque[int] = deque(maxlen=window)
+        self.__overlay_id: int | None = None
+
+    @property
+    def window(self) -> int:
+        """
+        Get the number of recent ticks the statistics cover
+        """
+        return self.__window
+
+    def record(self, phase: str, name: str, duration_ns: int) -> None:
+        """
+        Add a duration to the running total of the current tick
+        """
+        self.__current[phase, name] += duration_ns
+
+    def commit(self, phase: str) -> None:
+        """
+        Close the current tick of the given phase, moving its totals into the
+        rolling windows
+        """
+        total = 0
+        for key in self.__current:
+            if key[0] == phase and key not in self.__samples:
+                self.__samples[key] = deque(maxlen=self.__window)
+        for key, samples in self.__samples.items():
+            if key[0] == phase:
+                # classes that did no work this tick count as zero
+                duration = self.__current.pop(key, 0)
+                total += duration
+                samples.append(duration)
+        self.__phase_totals[phase].append(total)
+        if phase == RENDER:
+            self.__frame_times.append(time.perf_counter_ns())
+
+    @property
+    def fps(self) -> float:
+        """
+        Get the number of rendered frames per second over the window
+        """
+        times = self.__frame_times
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) * 1e9 / (times[-1] - times[0])
+
+    def mean_ns(self, phase: str, name: str | None = None) -> float:
+        """
+        Get the mean per-tick duration of a phase, or of one element class
+        within it
+        """
+        samples = self.__phase_totals[phase] if name is None else self.__samples.get((phase, name))
+        if not samples:
+            return 0.0
+        return sum(samples) / len(samples)
+
+    def histogram(self, phase: str, name: str) -> dict[int, int]:
+        """
+        Get the distribution of per-tick durations of an element class as a
+        mapping from power-of-two bucket lower bounds (ns) to counts
+        """
+        buckets: dict[int, int] = defaultdict(int)
+        for duration in self.__samples.get((phase, name), ()):
+            buckets[1 << max(0, duration.bit_length() - 1)] += 1
+        return dict(sorted(buckets.items()))
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Get mean, 50th, 95th percentile and maximum per-tick durations in
+        milliseconds for every element class and phase
+        """
+        result: dict[str, dict[str, dict[str, float]]] = defaultdict(dict)
+        for (phase, name), samples in self.__samples.items():
+            ordered = sorted(samples)
+            result[name][phase] = {
+                "mean": sum(ordered) / len(ordered) / 1e6,
+                "p50": ordered[len(ordered) // 2] / 1e6,
+                "p95": ordered[min(len(ordered) - 1, len(ordered) * 95 // 100)] / 1e6,
+                "max": ordered[-1] / 1e6,
+            }
+        return dict(result)
+
+    def top(self, count: int = 3) -> list[tuple[str, float]]:
+        """
+        Get the element classes with the highest mean update plus render time
+        per tick, in milliseconds
+        """
+        costs: dict[str, float] = defaultdict(float)
+        for (phase, name) in self.__samples:
+            costs[name] += self.mean_ns(phase, name) / 1e6
+        return sorted(costs.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def render_overlay(self, canvas) -> None:
+        """
+        Draw or refresh a text overlay showing FPS, tick time and the three
+        most expensive element classes in the top-left corner of the canvas
+        """
+        tick_ms = (self.mean_ns(UPDATE) + self.mean_ns(RENDER)) / 1e6
+        lines = [f"FPS {self.fps:.1f}  tick {tick_ms:.2f} ms"]
+        lines += [f"{name} {cost:.2f} ms" for name, cost in self.top(3)]
+        text = "\n".join(lines)
+        if self.__overlay_id is None:
+            self.__overlay_id = canvas.create_text(5, 5, text=text, anchor="nw",
+                                                   font=("Courier", 10), fill="grey")
+        else:
+            canvas.itemconfigure(self.__overlay_id, text=text)
+            canvas.tag_raise(self.__overlay_id)
+
+    def remove_overlay(self, canvas) -> None:
+        """
+        Delete the overlay from the canvas, if drawn
+        """
+        if self.__overlay_id is not None:
+            canvas.delete(self.__overlay_id)
+            self.__overlay_id = None
@@ -0,0 +1,132 @@
+"""
+The replay module records the waypoint clicks of a Turtle's Adventure session
+together with the tick at which they happened, and replays them against a
+headless game, as fast as the CPU allows.
+
+Usage: python replay.py SESSION_FILE [--ticks N]
+"""
+import argparse
+import struct
+import time
+
+from turtle_adventure import TurtleAdventureGame
+
+MAGIC = b"TADV"
+VERSION = 1
+# magic, version, seed, level, screen width, screen height, update delay
+_HEADER = struct.Struct("<4sHQHHHH")
+# tick, x, y
+_EVENT = struct.Struct("<Idd")
+
+
+class Recording:
+    """
+    A recorded session: the game settings needed to recreate it and the list
+    of (tick, x, y) clicks.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, seed: int, level: int, screen_width: int, screen_height: int,
+                 update_delay: int = 33):
+        # checked up front, so that save() cannot fail after a whole session
+        if not 0 <= seed < 2 ** 64:
+            raise ValueError(f"seed must be between 0 and 2**64 - 1, got {seed}")
+        if not 0 <= level < 2 ** 16:
+            raise ValueError(f"level must be between 0 and 65535, got {level}")
+        self.seed: int = seed
+        self.level: int = level
+        self.screen_width: int = screen_width
+        self.screen_height: int = screen_height
+        self.update_delay: int = update_delay
+        self.events: list[tuple[int, float, float]] = []
+
+    @classmethod
+    def attach(cls, game: TurtleAdventureGame) -> "Recording":
+        """
+        Create a recording of the given game that captures all its clicks.
+        """
+        recording = cls(game.seed, game.level, game.screen_width, game.screen_height,
+                        game.update_delay)
+        game.add_click_listener(recording.record)
+        return recording
+
+    def record(self, tick: int, x: float, y: float) -> None:
+        """
+        Add a click that happened after the given number of ticks.
+        """
+        self.events.append((tick, x, y))
+
+    def save(self, path: str) -> None:
+        """
+        Write the recording to a compact binary file.
+        """
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, self.seed, self.level,
+                                    self.screen_width, self.screen_height, self.update_delay))
+            for event in self.events:
+                file.write(_EVENT.pack(*event))
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        """
+        Read a recording written by save().
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, seed, level, width, height, delay = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Turtle's Adventure recording")
+        recording = cls(seed, level, width, height, delay)
+        recording.events = list(_EVENT.iter_unpack(data[_HEADER.size:]))
+        return recording
+
+
+def replay(recording: Recording, max_ticks: int = 100_000) -> TurtleAdventureGame:
+    """
+    Recreate the recorded game headless and feed it the recorded clicks at
+    the recorded ticks.  The game runs until it ends, or for at most max_ticks
+    ticks, and is returned for inspection.
+    """
+    game = TurtleAdventureGame(None, recording.screen_width, recording.screen_height,
+                               level=recording.level, headless=True, seed=recording.seed)
+    events = sorted(recording.events, key=lambda event: event[0])
+    position = 0
+    # clicks made before the game started
+    while position < len(events) and events[position][0] == 0:
+        game.click(events[position][1], events[position][2])
+        position += 1
+    game.start()
+    for tick, x, y in events[position:]:
+        if tick > max_ticks:
+            break
+        game.run_headless(tick - game.tick)
+        if not game.is_started:
+            return game
+        game.click(x, y)
+    if game.is_started:
+        game.run_headless(max(0, max_ticks - game.tick))
+    return game
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Replay a recorded session and report its outcome and speed.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("session", help="recording written by main.py --record")
+    parser.add_argument("--ticks", type=int, default=100_000,
+                        help="stop after this many ticks if the game has not ended")
+    args = parser.parse_args(argv)
+
+    recording = Recording.load(args.session)
+    start = time.perf_counter()
+    game = replay(recording, args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"outcome: {game.outcome or 'none'} after {game.tick} ticks "
+          f"({len(recording.events)} clicks, seed {recording.seed}, level {recording.level})")
+    print(f"replayed in {elapsed:.3f} s ({game.tick / elapsed:.0f} ticks/s, "
+          f"{game.tick * recording.update_delay / 1000 / elapsed:.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
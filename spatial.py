@@ -0,0 +1,289 @@
+"""
+The spatial module provides spatial indexes used as a broad phase for
+collision and proximity queries, so that only nearby candidates need an exact
+test.
+"""
+import numpy as np
+
+_CELL_OFFSET = 1 << 15  # keeps negative cell coordinates positive in keys
+
+
+class SpatialHash:
+    """
+    A uniform-grid spatial hash of integer ids (e.g., EnemyEngine rows).
+    Each id lives in the bucket of the cell containing its position; buckets
+    are updated incrementally, only for ids that changed cell.
+    """
+
+    def __init__(self, cell_size: float = 40):
+        self.__cell_size = cell_size
+        self.__buckets: dict[int, set[int]] = {}
+        self.__cells = np.full(64, -1, dtype=np.int64)  # cell key of each id
+
+    @property
+    def cell_size(self) -> float:
+        """
+        Get the side length of a grid cell
+        """
+        return self.__cell_size
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.__buckets.values())
+
+    def __cell_of(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self.__cell_size), int(y // self.__cell_size)
+
+    @staticmethod
+    def __key(cx, cy):
+        return (cx + _CELL_OFFSET) * (2 * _CELL_OFFSET) + (cy + _CELL_OFFSET)
+
+    def __reserve(self, max_id: int) -> None:
+        if max_id >= len(self.__cells):
+            grown = np.full(max(max_id + 1, 2 * len(self.__cells)), -1, dtype=np.int64)
+            grown[:len(self.__cells)] = self.__cells
+            self.__cells = grown
+
+    def __move(self, item_id: int, old_key: int, new_key: int) -> None:
+        if old_key >= 0:
+            bucket = self.__buckets[old_key]
+            bucket.discard(item_id)
+            if not bucket:
+                del self.__buckets[old_key]
+        self.__buckets.setdefault(new_key, set()).add(item_id)
+
+    def insert(self, item_id: int, x: float, y: float) -> None:
+        """
+        Add an id at the given position, or move it there if already present
+        """
+        self.__reserve(item_id)
+        key = self.__key(*self.__cell_of(x, y))
+        old_key = int(self.__cells[item_id])
+        if key != old_key:
+            self.__move(item_id, old_key, key)
+            self.__cells[item_id] = key
+
+    def remove(self, item_id: int) -> None:
+        """
+        Remove an id from the index
+        """
+        if item_id >= len(self.__cells) or self.__cells[item_id] < 0:
+            return
+        key = int(self.__cells[item_id])
+        bucket = self.__buckets[key]
+        bucket.discard(item_id)
+        if not bucket:
+            del self.__buckets[key]
+        self.__cells[item_id] = -1
+
+    def sync(self, ids: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> int:
+        """
+        Bring the buckets up to date with the given positions, touching only
+        the ids whose cell changed.  Return the number of ids moved.
+        """
+        if not len(ids):
+            return 0
+        self.__reserve(int(ids.max()))
+        cx = np.floor_divide(xs, self.__cell_size).astype(np.int64)
+        cy = np.floor_divide(ys, self.__cell_size).astype(np.int64)
+        keys = self.__key(cx, cy)
+        old_keys = self.__cells[ids]
+        moved = np.flatnonzero(keys != old_keys)
+        for i in moved.tolist():
+            self.__move(int(ids[i]), int(old_keys[i]), int(keys[i]))
+        self.__cells[ids] = keys
+        return len(moved)
+
+    def query_rect(self, x1: float, y1: float, x2: float, y2: float) -> list[int]:
+        """
+        Return the ids in all cells overlapping the rectangle; these are
+        candidates that still need an exact test
+        """
+        cx1, cy1 = self.__cell_of(x1, y1)
+        cx2, cy2 = self.__cell_of(x2, y2)
+        result = []
+        buckets = self.__buckets
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                bucket = buckets.get(self.__key(cx, cy))
+                if bucket:
+                    result.extend(bucket)
+        return result
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    # put the low 16 bits of each value in the even bit positions
+    v = values.astype(np.uint64)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+class LinearQuadtree:
+    """
+    A linear quadtree of integer ids (e.g., EnemyEngine rows) over a given
+    area.  The area is divided into 2**max_depth cells per side and the ids
+    are kept sorted by the Morton (Z-order) code of their cell, so every node
+    of the tree is a contiguous run of the sorted ids and the tree needs no
+    node objects.  When positions change, the order is rebuilt with one
+    NumPy sort instead of moving ids one by one.  Queries only descend into
+    nodes that overlap the rectangle and hold more than capacity ids, so
+    clustered layouts, which overfill a few cells of a uniform grid, yield
+    fewer candidates.  Ids outside the area are kept in the border cells.
+    It has the same interface as SpatialHash, except that query_rect()
+    returns an array.
+    """
+
+    def __init__(self, width: float, height: float, capacity: int = 32, max_depth: int = 6):
+        self.__capacity = capacity
+        self.__side = 1 << max_depth
+        self.__scale_x = self.__side / width
+        self.__scale_y = self.__side / height
+        # bounds of the four children of a node of each side length, as
+        # code offsets from the node's first code
+        self.__child_bounds = {side: np.arange(5, dtype=np.uint64) * np.uint64(side * side // 4)
+                               for side in (1 << depth for depth in range(1, max_depth + 1))}
+        self.__codes = np.zeros(64, dtype=np.uint64)  # Morton code of each id
+        self.__present = np.zeros(64, dtype=bool)
+        self.__stale = False
+        self.__members_changed = False
+        self.__sorted_ids = np.zeros(0, dtype=np.int64)
+        self.__sorted_codes = np.zeros(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.__present))
+
+    def __reserve(self, max_id: int) -> None:
+        old_size = len(self.__codes)
+        if max_id >= old_size:
+            size = max(max_id + 1, 2 * old_size)
+            codes = np.zeros(size, dtype=np.uint64)
+            codes[:old_size] = self.__codes
+            present = np.zeros(size, dtype=bool)
+            present[:old_size] = self.__present
+            self.__codes, self.__present = codes, present
+
+    def __cells_of(self, xs, ys) -> tuple[np.ndarray, np.ndarray]:
+        last = self.__side - 1
+        cx = np.clip(np.floor(np.asarray(xs) * self.__scale_x), 0, last)
+        cy = np.clip(np.floor(np.asarray(ys) * self.__scale_y), 0, last)
+        return cx, cy
+
+    def __code_of(self, xs, ys) -> np.ndarray:
+        cx, cy = self.__cells_of(xs, ys)
+        return _spread_bits(cx) | (_spread_bits(cy) << np.uint64(1))
+
+    def __rebuild(self) -> None:
+        if self.__members_changed:
+            ids = np.flatnonzero(self.__present)
+            order = np.argsort(self.__codes[ids])
+            self.__members_changed = False
+        else:
+            # ids move little between rebuilds, so the previous order is
+            # nearly sorted, which the stable sort (timsort) is fast at
+            ids = self.__sorted_ids
+            order = np.argsort(self.__codes[ids], kind="stable")
+        self.__sorted_ids = ids[order]
+        self.__sorted_codes = self.__codes[self.__sorted_ids]
+        self.__stale = False
+
+    def insert(self, item_id: int, x: float, y: float) -> None:
+        """
+        Add an id at the given position, or move it there if already present
+        """
+        self.__reserve(item_id)
+        self.__codes[item_id] = self.__code_of(x, y)
+        if not self.__present[item_id]:
+            self.__present[item_id] = True
+            self.__members_changed = True
+        self.__stale = True
+
+    def remove(self, item_id: int) -> None:
+        """
+        Remove an id from the index
+        """
+        if item_id < len(self.__present) and self.__present[item_id]:
+            self.__present[item_id] = False
+            self.__members_changed = True
+            self.__stale = True
+
+    def sync(self, ids: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> int:
+        """
+        Bring the tree up to date with the given positions, adding ids that
+        are not in it yet.  The sorted order is rebuilt by the next query,
+        and only if some id was added or changed cell.  Return the number of
+        ids that changed cell.
+        """
+        if not len(ids):
+            return 0
+        self.__reserve(int(ids.max()))
+        codes = self.__code_of(xs, ys)
+        moved = int(np.count_nonzero(codes != self.__codes[ids]))
+        if moved:
+            self.__codes[ids] = codes
+            self.__stale = True
+        if not self.__present[ids].all():
+            self.__present[ids] = True
+            self.__members_changed = True
+            self.__stale = True
+        return moved
+
+    # pylint: disable=too-many-locals
+    def query_rect(self, x1: float, y1: float, x2: float, y2: float) -> np.ndarray:
+        """
+        Return the ids in all leaves overlapping the rectangle; these are
+        candidates that still need an exact test
+        """
+        if self.__stale:
+            self.__rebuild()
+        ids = self.__sorted_ids
+        if not len(ids):
+            return ids
+        cx, cy = self.__cells_of((x1, x2), (y1, y2))
+        cx1, cx2, cy1, cy2 = int(cx[0]), int(cx[1]), int(cy[0]), int(cy[1])
+        codes = self.__sorted_codes
+        child_bounds = self.__child_bounds
+        capacity = self.__capacity
+        runs: list[list[int]] = []
+        # nodes as (first cell column, first cell row, side in cells, first
+        # code, run of sorted ids); children are pushed in reverse so that
+        # runs come out in code order and adjacent ones can be joined
+        stack = [(0, 0, self.__side, 0, 0, len(ids))]
+        while stack:
+            x, y, side, start, lo, hi = stack.pop()
+            if x > cx2 or y > cy2 or x + side <= cx1 or y + side <= cy1 or lo == hi:
+                continue
+            if (side == 1 or hi - lo <= capacity
+                    or (cx1 <= x and x + side - 1 <= cx2 and cy1 <= y and y + side - 1 <= cy2)):
+                if runs and runs[-1][1] == lo:
+                    runs[-1][1] = hi
+                else:
+                    runs.append([lo, hi])
+                continue
+            bounds = child_bounds[side]
+            b0, b1, b2, b3, b4 = np.searchsorted(codes[lo:hi], start + bounds).tolist()
+            half = side // 2
+            quarter = half * half
+            stack.append((x + half, y + half, half, start + 3 * quarter, lo + b3, lo + b4))
+            stack.append((x, y + half, half, start + 2 * quarter, lo + b2, lo + b3))
+            stack.append((x + half, y, half, start + quarter, lo + b1, lo + b2))
+            stack.append((x, y, half, start, lo + b0, lo + b1))
+        if len(runs) == 1:
+            return ids[runs[0][0]:runs[0][1]]
+        return np.concatenate([ids[lo:hi] for lo, hi in runs]) if runs else ids[:0]
+
+
+INDEX_TYPES = ("grid", "quadtree")
+
+
+def create_index(kind: str, width: float, height: float) -> SpatialHash | LinearQuadtree:
+    """
+    Create an empty spatial index of the given kind, "grid" or "quadtree",
+    for an area of the given size
+    """
+    if kind == "grid":
+        return SpatialHash(cell_size=40)
+    if kind == "quadtree":
+        return LinearQuadtree(width, height)
+    raise ValueError(f"unknown spatial index {kind!r}, expected one of {', '.join(INDEX_TYPES)}")
@@ -0,0 +1,45 @@
+"""
+Tests of FrameBudget.
+"""
+import unittest
+
+import numpy as np
+
+from budget import FrameBudget
+
+
+class SelectTest(unittest.TestCase):
+    """
+    Tests of FrameBudget.select().
+    """
+
+    def degraded(self, level: int) -> FrameBudget:
+        budget = FrameBudget(1, max_level=level, patience=1, smoothing=1)
+        while budget.level < level:
+            budget.record(10)
+        return budget
+
+    def test_far_elements_take_turns(self):
+        budget = self.degraded(3)
+        indices = np.arange(10)
+        xs = np.full(10, 1000.0)
+        ys = np.zeros(10)
+        urgent = np.zeros(10, dtype=bool)
+        rendered = set()
+        for _ in range(4):
+            # one select() per frame, however many ticks the frame ran
+            rendered.update(budget.select(indices, xs, ys, urgent, None, (0, 0)).tolist())
+        self.assertEqual(set(range(10)), rendered)
+
+    def test_urgent_and_near_elements_always_render(self):
+        budget = self.degraded(3)
+        indices = np.arange(4)
+        xs = np.array([1000.0, 1000.0, 10.0, 10.0])
+        urgent = np.array([True, False, False, False])
+        for _ in range(4):
+            kept = budget.select(indices, xs, np.zeros(4), urgent, None, (0, 0)).tolist()
+            self.assertLessEqual({0, 2, 3}, set(kept))
+
+
+if __name__ == "__main__":
+    unittest.main()
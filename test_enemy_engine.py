@@ -0,0 +1,112 @@
+"""
+Tests of the swept collision checks of EnemyEngine.
+"""
+import math
+import unittest
+
+import numpy as np
+
+from enemy_engine import EnemyEngine, CHASING, BOUNCING
+from gamelib import EntityStore
+
+
+class SweepTest(unittest.TestCase):
+    """
+    Tests of EnemyEngine.contact_times(), sweep() and first_contact().
+    """
+
+    def setUp(self):
+        self.entities = EntityStore()
+        self.engine = EnemyEngine(self.entities)
+
+    # pylint: disable=too-many-arguments
+    def add(self, kind: int, x: float, y: float, size: float = 20, speed: float = 0,
+            heading: float = 0.0) -> int:
+        row = self.entities.allocate(None)
+        self.engine.configure(row, kind, size, speed, heading, bounds=(-1e9, -1e9, 1e9, 1e9))
+        self.entities.x[row] = x
+        self.entities.y[row] = y
+        self.engine.activate(row)
+        return row
+
+    @staticmethod
+    def touches(kind: int, px: float, py: float, ex: float, ey: float, size: float) -> bool:
+        if kind == CHASING:
+            return math.hypot(px - ex, py - ey) < size
+        return abs(px - ex) < size / 2 and abs(py - ey) < size / 2
+
+    def test_matches_interpolated_substeps(self):
+        rng = np.random.default_rng(23)
+        substeps = 1000
+        engine = self.engine
+        for _ in range(300):
+            kind = CHASING if rng.random() < 0.5 else BOUNCING
+            size = rng.uniform(5, 40)
+            row = self.add(kind, *rng.uniform(-50, 50, 2), size=size)
+            engine.prev_x[row], engine.prev_y[row] = rng.uniform(-50, 50, 2)
+            x0, y0, x1, y1 = rng.uniform(-60, 60, 4)
+            found = float(engine.contact_times(x0, y0, x1, y1, np.array([row]))[0])
+
+            first = None
+            for i in range(substeps + 1):
+                t = i / substeps
+                ex = engine.prev_x[row] + t * (engine.x[row] - engine.prev_x[row])
+                ey = engine.prev_y[row] + t * (engine.y[row] - engine.prev_y[row])
+                if self.touches(kind, x0 + t * (x1 - x0), y0 + t * (y1 - y0), ex, ey, size):
+                    first = t
+                    break
+            if first is not None:
+                # the exact contact lies within the sub-step before the first
+                # sampled contact
+                self.assertLessEqual(found, first + 1e-9)
+                self.assertGreaterEqual(found, first - 1 / substeps - 1e-9)
+            elif found <= 1:
+                # a graze shorter than a sub-step: the contact must still lie
+                # on the enemy's outline
+                ex = engine.prev_x[row] + found * (engine.x[row] - engine.prev_x[row])
+                ey = engine.prev_y[row] + found * (engine.y[row] - engine.prev_y[row])
+                dx, dy = x0 + found * (x1 - x0) - ex, y0 + found * (y1 - y0) - ey
+                if kind == CHASING:
+                    self.assertAlmostEqual(size, math.hypot(dx, dy), places=6)
+                else:
+                    self.assertAlmostEqual(size / 2, max(abs(dx), abs(dy)), places=6)
+            engine.deactivate(row)
+
+    def test_no_motion_agrees_with_hits(self):
+        engine = self.engine
+        self.add(CHASING, 100, 100)
+        self.add(BOUNCING, 200, 100)
+        for px in range(70, 240, 3):
+            for py in range(70, 130, 3):
+                self.assertEqual(engine.hits(px, py),
+                                 len(engine.sweep(px, py, px, py)) > 0, (px, py))
+
+    def test_fast_player_through_still_enemy(self):
+        engine = self.engine
+        for kind in (CHASING, BOUNCING):
+            row = self.add(kind, 100, 100, size=20)
+            # at speed 60 both ends of the move are clear of the enemy
+            self.assertFalse(engine.hits(70, 100, [row]))
+            self.assertFalse(engine.hits(130, 100, [row]))
+            self.assertEqual([row], engine.sweep(70, 100, 130, 100, [row]).tolist())
+            self.assertAlmostEqual(1 / 6 if kind == CHASING else 1 / 3,
+                                   engine.first_contact(70, 100, 130, 100, [row]))
+            engine.deactivate(row)
+
+    def test_fast_enemy_across_still_player(self):
+        engine = self.engine
+        row = self.add(BOUNCING, 65, 100, size=20, speed=70)
+        engine.step(0, 0)
+        self.assertEqual(135, engine.x[row])
+        # the player is clear of the enemy before and after the step
+        self.assertFalse(engine.hits(100, 100))
+        self.assertEqual([row], engine.sweep(100, 100, 100, 100).tolist())
+        self.assertIsNotNone(engine.first_contact(100, 100, 100, 100))
+
+    def test_miss_reports_none(self):
+        self.add(CHASING, 100, 100)
+        self.assertIsNone(self.engine.first_contact(0, 0, 50, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""
+Tests of recording and replaying sessions.
+"""
+import os
+import tempfile
+import unittest
+
+from replay import Recording
+
+
+class RecordingTest(unittest.TestCase):
+    """
+    Tests of Recording.
+    """
+
+    def test_save_and_load(self):
+        recording = Recording(2 ** 64 - 1, 65535, 800, 500)
+        recording.record(10, 700.5, 250.25)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "session.tadv")
+            recording.save(path)
+            loaded = Recording.load(path)
+        self.assertEqual((2 ** 64 - 1, 65535), (loaded.seed, loaded.level))
+        self.assertEqual([(10, 700.5, 250.25)], loaded.events)
+
+    def test_out_of_range_settings_fail_before_the_session(self):
+        for seed, level in ((-1, 1), (2 ** 64, 1), (1, -1), (1, 70000)):
+            with self.assertRaises(ValueError):
+                Recording(seed, level, 800, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
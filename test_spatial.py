@@ -0,0 +1,67 @@
+"""
+Tests of the spatial indexes.
+"""
+import unittest
+
+import numpy as np
+
+from spatial import INDEX_TYPES, create_index
+
+
+class IndexTest(unittest.TestCase):
+    """
+    Tests that every kind of index returns at least the ids inside a
+    rectangle, as the broad phase of exact tests.
+    """
+
+    def check_queries(self, index, ids: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                      rng: np.random.Generator) -> None:
+        for _ in range(200):
+            x1, y1 = rng.uniform(-100, 900), rng.uniform(-100, 600)
+            x2, y2 = x1 + rng.uniform(0, 150), y1 + rng.uniform(0, 150)
+            inside = (xs >= x1) & (xs <= x2) & (ys >= y1) & (ys <= y2)
+            candidates = index.query_rect(x1, y1, x2, y2)
+            self.assertEqual(len(candidates), len(set(np.asarray(candidates).tolist())))
+            self.assertLessEqual(set(ids[inside].tolist()),
+                                 set(np.asarray(candidates).tolist()))
+
+    def test_queries_cover_moving_clustered_ids(self):
+        rng = np.random.default_rng(22)
+        for kind in INDEX_TYPES:
+            index = create_index(kind, 800, 500)
+            ids = np.arange(3000)
+            # a cluster around home, plus some ids off the screen
+            xs = np.concatenate([rng.normal(700, 40, 2800), rng.uniform(-100, 900, 200)])
+            ys = np.concatenate([rng.normal(250, 40, 2800), rng.uniform(-100, 600, 200)])
+            for item_id in ids.tolist():
+                index.insert(item_id, xs[item_id], ys[item_id])
+            self.check_queries(index, ids, xs, ys, rng)
+            for _ in range(5):
+                xs = xs + rng.uniform(-30, 30, len(ids))
+                ys = ys + rng.uniform(-30, 30, len(ids))
+                index.sync(ids, xs, ys)
+                self.check_queries(index, ids, xs, ys, rng)
+
+    def test_sync_adds_new_ids(self):
+        for kind in INDEX_TYPES:
+            index = create_index(kind, 800, 500)
+            ids = np.arange(10)
+            index.sync(ids, np.full(10, 400.0), np.full(10, 250.0))
+            self.assertEqual(10, len(index))
+            self.assertEqual(set(range(10)),
+                             set(np.asarray(index.query_rect(0, 0, 800, 500)).tolist()))
+
+    def test_removed_ids_are_not_returned(self):
+        for kind in INDEX_TYPES:
+            index = create_index(kind, 800, 500)
+            for item_id in range(100):
+                index.insert(item_id, 400, 250)
+            for item_id in range(0, 100, 2):
+                index.remove(item_id)
+            self.assertEqual(50, len(index))
+            self.assertEqual(set(range(1, 100, 2)),
+                             set(np.asarray(index.query_rect(0, 0, 800, 500)).tolist()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Tests of TurtleAdventureGame running headless.
+"""
+import unittest
+
+from gamelib import GameElement
+from turtle_adventure import TurtleAdventureGame, ChasingEnemy, RandomEnemy
+
+
+class ResetTest(unittest.TestCase):
+    """
+    Tests of TurtleAdventureGame.reset().
+    """
+
+    def setUp(self):
+        self.game = TurtleAdventureGame(None, 800, 500, level=1, headless=True, seed=7)
+
+    def assert_fresh_round(self):
+        game = self.game
+        self.assertIsNone(game.outcome)
+        self.assertTrue(game.is_started)
+        self.assertEqual([], game.enemies)
+        self.assertEqual(0, len(game.enemy_engine.rows))
+        # waypoint, home and player
+        self.assertEqual(3, game.element_count)
+        self.assertEqual((50, 250), (game.player.x, game.player.y))
+
+    def test_reset_deletes_added_enemies_once(self):
+        game = self.game
+        enemy = ChasingEnemy(game, 20, "blue")
+        enemy.x, enemy.y = 400, 400
+        game.add_enemy(enemy)
+        game.start()
+        game.run_headless(5)
+        game.reset()
+        self.assert_fresh_round()
+
+    def test_reset_from_outcome_listener_is_deferred(self):
+        game = self.game
+        rounds = []
+
+        def next_round(tick: int, outcome: str) -> None:
+            rounds.append((tick, outcome))
+            # runs mid-tick; the reset must wait until the tick is over
+            game.reset()
+            self.assertEqual(outcome, game.outcome)
+
+        game.add_outcome_listener(next_round)
+        game.start()
+        game.run_headless(200)
+        self.assertTrue(rounds)
+        self.assertTrue(game.is_started)
+
+    def test_rounds_differ(self):
+        game = self.game
+        game.start()
+        positions = []
+        for _ in range(3):
+            game.reset()
+            game.run_headless(30)
+            rows = game.enemy_engine.rows
+            positions.append(sorted(zip(game.entities.x[rows].tolist(),
+                                        game.entities.y[rows].tolist())))
+        self.assertNotEqual(positions[0], positions[1])
+        self.assertNotEqual(positions[1], positions[2])
+
+    def test_soak_200_rounds(self):
+        game = self.game
+        outcomes = []
+        game.add_outcome_listener(lambda tick, outcome: outcomes.append(outcome))
+        game.start()
+        for _ in range(200):
+            game.click(*game.level_data.home)
+            game.run_headless(500)
+            self.assertIsNotNone(game.outcome)
+            game.reset()
+            self.assert_fresh_round()
+        self.assertEqual(200, len(outcomes))
+        # pooled enemies are reused instead of growing the entity store
+        self.assertLess(game.entities.high_water, 100)
+
+
+class Remover(GameElement):
+    """
+    An invisible element that deletes another element from the game when it
+    is updated.
+    """
+
+    def __init__(self, game: TurtleAdventureGame, target: GameElement):
+        super().__init__(game)
+        self.target = target
+
+    def create(self) -> None:
+        pass
+
+    def update(self) -> None:
+        if self.target is not None:
+            self.game.delete_element(self.target)
+            self.target = None
+
+    def render(self) -> None:
+        pass
+
+    def delete(self) -> None:
+        pass
+
+
+class DeleteTest(unittest.TestCase):
+    """
+    Tests of deleting enemies during a tick.
+    """
+
+    def test_enemy_deleted_mid_tick_cannot_hit(self):
+        game = TurtleAdventureGame(None, 800, 500, level=1, headless=True, seed=1)
+        enemy = ChasingEnemy(game, 20, "blue")
+        enemy.x, enemy.y = game.player.x, game.player.y
+        game.add_enemy(enemy)
+        game.add_element(Remover(game, enemy))
+        game.start()
+        game.run_headless(1)
+        self.assertIsNone(game.outcome)
+        self.assertEqual(0, len(game.enemy_engine.rows))
+
+
+class PoolTest(unittest.TestCase):
+    """
+    Tests of enemies reused through the game's EnemyPool.
+    """
+
+    def test_reused_enemy_gets_its_type_speed_back(self):
+        game = TurtleAdventureGame(None, 800, 500, level=1, headless=True, seed=3)
+        generator = game.enemy_generator
+        fast = generator.spawn(RandomEnemy, 100, 100, speed=12)
+        self.assertEqual(12, fast.speed)
+        game.enemy_pool.release(fast)
+        enemy = generator.spawn(RandomEnemy, 100, 100)
+        self.assertIs(fast, enemy)
+        self.assertEqual(3, enemy.speed)
+
+
+class SpatialIndexTest(unittest.TestCase):
+    """
+    Tests of TurtleAdventureGame.set_spatial_index().
+    """
+
+    def test_switch_keeps_live_enemies(self):
+        outcomes = {}
+        for kind in ("grid", "quadtree"):
+            game = TurtleAdventureGame(None, 800, 500, level=1, headless=True, seed=1)
+            game.start()
+            game.run_headless(5)
+            game.set_spatial_index(kind)
+            self.assertEqual(len(game.enemy_engine.rows), len(game.query_rect(0, 0, 800, 500)))
+            game.run_headless(2000)
+            outcomes[kind] = (game.outcome, game.tick)
+        self.assertEqual("lose", outcomes["grid"][0])
+        self.assertEqual(outcomes["grid"], outcomes["quadtree"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,16 @@
+import functools
+import json
 import math
-from turtle import RawTurtle
-from gamelib import Game, GameElement
+import os
+import random
+from collections import deque
+from collections.abc import Callable
+from turtle import RawTurtle, TNavigator
+import numpy as np
+from gamelib import EntityStore, Game, GameElement
+from enemy_engine import EnemyEngine, CHASING, BOUNCING, FENCING
+from flowfield import FlowField
+from spatial import INDEX_TYPES, LinearQuadtree, SpatialHash, create_index
 
 
 class TurtleGameElement(GameElement):
@@ -8,6 +18,8 @@ class TurtleGameElement(GameElement):
     An abstract class representing all game elements related to the Turtle's Adventure game.
     """
 
+    __slots__ = ("__game",)
+
     def __init__(self, game: "TurtleAdventureGame"):
         super().__init__(game)
         self.__game: "TurtleAdventureGame" = game
@@ -20,20 +32,69 @@ class TurtleGameElement(GameElement):
         return self.__game
 
 
+class HeadlessTurtle(TNavigator):
+    """
+    A stand-in for RawTurtle providing the subset of its interface used by
+    Player, for games running in headless mode.  Coordinates and headings are
+    expressed in the game's world coordinates, as with setworldcoordinates().
+    Movement is inherited from TNavigator, the navigation part of RawTurtle,
+    so positions and headings round exactly as they do in a live game.
+    """
+
+    def __init__(self):
+        super().__init__("world")
+
+    def getscreen(self) -> "HeadlessTurtle":
+        """
+        Return an object accepting the screen calls made by Player.
+        """
+        return self
+
+    def update(self) -> None:
+        """
+        Do nothing, as there is no screen to refresh.
+        """
+
+    def tracer(self, *_) -> None:
+        """
+        Do nothing, as there is no animation to disable.
+        """
+
+    def shape(self, *_) -> None:
+        """
+        Do nothing, as there is no shape to draw.
+        """
+
+    def color(self, *_) -> None:
+        """
+        Do nothing, as there is no shape to draw.
+        """
+
+    def penup(self) -> None:
+        """
+        Do nothing, as there is no pen.
+        """
+
+
 class Waypoint(TurtleGameElement):
     """
     Represent the waypoint to which the player will move.
     """
 
+    __slots__ = ("__id1", "__id2", "__active", "__shown")
+
     def __init__(self, game: "TurtleAdventureGame"):
         super().__init__(game)
         self.__id1: int
         self.__id2: int
         self.__active: bool = False
+        self.__shown: bool = False
+        game.entities.set_flags(self.index, EntityStore.URGENT)
 
     def create(self) -> None:
-        self.__id1 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green")
-        self.__id2 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green")
+        self.__id1 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green", state="hidden")
+        self.__id2 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green", state="hidden")
+        self.__shown = False
 
     def delete(self) -> None:
         self.canvas.delete(self.__id1)
@@ -44,16 +105,22 @@ class Waypoint(TurtleGameElement):
         pass
 
     def render(self) -> None:
+        # only a change of visibility needs item configuration; moving a
+        # shown waypoint is a batched coords change
         if self.is_active:
-            self.canvas.itemconfigure(self.__id1, state="normal")
-            self.canvas.itemconfigure(self.__id2, state="normal")
-            self.canvas.tag_raise(self.__id1)
-            self.canvas.tag_raise(self.__id2)
-            self.canvas.coords(self.__id1, self.x - 10, self.y - 10, self.x + 10, self.y + 10)
-            self.canvas.coords(self.__id2, self.x - 10, self.y + 10, self.x + 10, self.y - 10)
-        else:
+            if not self.__shown:
+                self.canvas.itemconfigure(self.__id1, state="normal")
+                self.canvas.itemconfigure(self.__id2, state="normal")
+                self.canvas.tag_raise(self.__id1)
+                self.canvas.tag_raise(self.__id2)
+                self.__shown = True
+            batcher = self.game.render_batcher
+            batcher.coords(self.__id1, self.x - 10, self.y - 10, self.x + 10, self.y + 10)
+            batcher.coords(self.__id2, self.x - 10, self.y + 10, self.x + 10, self.y - 10)
+        elif self.__shown:
             self.canvas.itemconfigure(self.__id1, state="hidden")
             self.canvas.itemconfigure(self.__id2, state="hidden")
+            self.__shown = False
 
     def activate(self, x: float, y: float) -> None:
         """
@@ -62,12 +129,14 @@ class Waypoint(TurtleGameElement):
         self.__active = True
         self.x = x
         self.y = y
+        self.mark_dirty()
 
     def deactivate(self) -> None:
         """
         Mark this waypoint as inactive.
         """
         self.__active = False
+        self.mark_dirty()
 
     @property
     def is_active(self) -> bool:
@@ -82,10 +151,13 @@ class Home(TurtleGameElement):
     Represent the player's home.
     """
 
+    __slots__ = ("__id", "__size")
+
     def __init__(self, game: "TurtleAdventureGame", pos: tuple[int, int], size: int):
         super().__init__(game)
         self.__id: int
         self.__size: int = size
+        game.entities.size[self.index] = size
         x, y = pos
         self.x = x
         self.y = y
@@ -100,6 +172,8 @@ class Home(TurtleGameElement):
     @size.setter
     def size(self, val: int) -> None:
         self.__size = val
+        self.game.entities.size[self.index] = val
+        self.mark_dirty()
 
     def create(self) -> None:
         self.__id = self.canvas.create_rectangle(0, 0, 0, 0, outline="brown", width=2)
@@ -112,11 +186,11 @@ class Home(TurtleGameElement):
         pass
 
     def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2)
+        self.game.render_batcher.coords(self.__id,
+                                        self.x - self.size / 2,
+                                        self.y - self.size / 2,
+                                        self.x + self.size / 2,
+                                        self.y + self.size / 2)
 
     def contains(self, x: float, y: float):
         """
@@ -126,26 +200,46 @@ class Home(TurtleGameElement):
         y1, y2 = self.y - self.size / 2, self.y + self.size / 2
         return x1 <= x <= x2 and y1 <= y <= y2
 
+    def first_contact(self, x0: float, y0: float, x1: float, y1: float) -> float | None:
+        """
+        Return the fraction of the way from (x0, y0) to (x1, y1) at which a
+        point moving along it first enters home, or None if it does not.
+        """
+        half = self.size / 2
+        enter, leave = 0.0, 1.0
+        for start, end, centre in ((x0, x1, self.x), (y0, y1, self.y)):
+            low, high = centre - half - start, centre + half - start
+            delta = end - start
+            if delta == 0:
+                if not low <= 0 <= high:
+                    return None
+                continue
+            t1, t2 = low / delta, high / delta
+            enter = max(enter, min(t1, t2))
+            leave = min(leave, max(t1, t2))
+        return enter if enter <= leave else None
+
 
 class Player(TurtleGameElement):
     """
     Represent the main player, implemented using Python's turtle.
     """
 
-    def __init__(self, game: "TurtleAdventureGame", turtle: RawTurtle, speed: float = 5):
+    __slots__ = ("__speed", "__turtle")
+
+    def __init__(self, game: "TurtleAdventureGame", turtle: RawTurtle | HeadlessTurtle, speed: float = 5):
         super().__init__(game)
         self.__speed: float = speed
-        self.__turtle: RawTurtle = turtle
+        self.__turtle: RawTurtle | HeadlessTurtle = turtle
+        game.entities.set_flags(self.index, EntityStore.URGENT)
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
+        turtle = self.__turtle
         turtle.getscreen().tracer(False)  # disable turtle's built-in animation
         turtle.shape("turtle")
         turtle.color("green")
         turtle.penup()
 
-        self.__turtle = turtle
-
     @property
     def speed(self) -> float:
         """
@@ -161,14 +255,13 @@ class Player(TurtleGameElement):
         pass
 
     def update(self) -> None:
-        # check if player has arrived home
-        if self.game.home.contains(self.x, self.y):
-            self.game.game_over_win()
+        # arriving home is detected by the game's collision stage
         turtle = self.__turtle
         waypoint = self.game.waypoint
         if self.game.waypoint.is_active:
             turtle.setheading(turtle.towards(waypoint.x, waypoint.y))
             turtle.forward(self.speed)
+            self.__store_position()
             if turtle.distance(waypoint.x, waypoint.y) < self.speed:
                 waypoint.deactivate()
 
@@ -176,6 +269,14 @@ class Player(TurtleGameElement):
         self.__turtle.goto(self.x, self.y)
         self.__turtle.getscreen().update()
 
+    def __store_position(self) -> None:
+        # copy the turtle's position into the player's EntityStore row, so
+        # that batch operations over the store see where the player is
+        entities = self.game.entities
+        entities.x[self.index] = self.__turtle.xcor()
+        entities.y[self.index] = self.__turtle.ycor()
+        self.mark_dirty()
+
     # override original property x's getter/setter to use turtle's methods
     # instead
     @property
@@ -185,6 +286,7 @@ class Player(TurtleGameElement):
     @x.setter
     def x(self, val: float) -> None:
         self.__turtle.setx(val)
+        self.__store_position()
 
     # override original property y's getter/setter to use turtle's methods
     # instead
@@ -195,17 +297,88 @@ class Player(TurtleGameElement):
     @y.setter
     def y(self, val: float) -> None:
         self.__turtle.sety(val)
+        self.__store_position()
+
+
+class PolygonPlayer(TurtleGameElement):
+    """
+    Represent the main player as a single turtle-shaped canvas polygon.  The
+    position and heading are kept in plain floats, so moving the player costs
+    one coords() call per frame instead of a full turtle screen update.
+    """
+
+    __slots__ = ("__id", "__speed", "__heading")
+
+    # the outline of turtle's built-in "turtle" shape, pointing along +y
+    SHAPE = ((0, 16), (-2, 14), (-1, 10), (-4, 7), (-7, 9), (-9, 8), (-6, 5), (-7, 1),
+             (-5, -3), (-8, -6), (-6, -8), (-4, -5), (0, -7), (4, -5), (6, -8), (8, -6),
+             (5, -3), (7, 1), (6, 5), (9, 8), (7, 9), (4, 7), (1, 10), (2, 14))
+
+    def __init__(self, game: "TurtleAdventureGame", speed: float = 5):
+        super().__init__(game)
+        self.__id: int
+        self.__speed: float = speed
+        self.__heading: float = 0  # radians
+        game.entities.set_flags(self.index, EntityStore.URGENT)
+
+    def create(self) -> None:
+        self.__id = self.canvas.create_polygon(0, 0, 0, 0, fill="green", outline="green")
+
+    @property
+    def speed(self) -> float:
+        """
+        Give the player's current speed.
+        """
+        return self.__speed
+
+    @speed.setter
+    def speed(self, val: float) -> None:
+        self.__speed = val
+
+    def delete(self) -> None:
+        self.canvas.delete(self.__id)
+
+    def update(self) -> None:
+        # arriving home is detected by the game's collision stage
+        waypoint = self.game.waypoint
+        if waypoint.is_active:
+            self.__heading = math.atan2(waypoint.y - self.y, waypoint.x - self.x)
+            self.x += self.speed * math.cos(self.__heading)
+            self.y += self.speed * math.sin(self.__heading)
+            if math.hypot(waypoint.x - self.x, waypoint.y - self.y) < self.speed:
+                waypoint.deactivate()
+
+    def render(self) -> None:
+        cos, sin = math.cos(self.__heading), math.sin(self.__heading)
+        x, y = self.x, self.y
+        points = []
+        for sx, sy in self.SHAPE:
+            points.append(x + sy * cos - sx * sin)
+            points.append(y + sy * sin + sx * cos)
+        self.game.render_batcher.coords(self.__id, points)
 
 
 class Enemy(TurtleGameElement):
     """
-    Define an abstract enemy for the Turtle's adventure game.
+    Define an abstract enemy for the Turtle's adventure game.  The enemy's
+    movement state lives in the game's EnemyEngine, at the same index as its
+    EntityStore row, and the engine moves all enemies in one batched step per
+    tick.
     """
 
-    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
+    __slots__ = ("__id", "__size", "__color", "__engine", "__pool")
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, game: "TurtleAdventureGame", size: int, color: str, kind: int,
+                 speed: float, heading: float = 0.0,
+                 bounds: tuple[float, float, float, float] = (0, 0, 0, 0)):
         super().__init__(game)
+        self.__id = 0
         self.__size = size
         self.__color = color
+        self.__engine: EnemyEngine = game.enemy_engine
+        self.__engine.configure(self.index, kind, size, speed, heading, bounds)
+        self.__pool: EnemyPool | None = None
 
     @property
     def size(self) -> float:
@@ -221,6 +394,66 @@ class Enemy(TurtleGameElement):
         """
         return self.__color
 
+    @property
+    def speed(self) -> float:
+        """
+        Get or set the speed of the enemy.
+        """
+        return float(self.__engine.speed[self.index])
+
+    @speed.setter
+    def speed(self, val: float) -> None:
+        self.__engine.speed[self.index] = val
+
+    def create(self) -> None:
+        if self.__id:
+            # reused from a pool; the canvas item already exists
+            self.canvas.itemconfigure(self.__id, state="normal")
+            self.mark_dirty()
+        else:
+            self.__id = self.canvas.create_oval(0, 0, 0, 0, outline=self.color, width=2)
+        self.__engine.activate(self.index)
+        self.game.enemy_grid.insert(self.index, self.x, self.y)
+
+    def detach(self) -> None:
+        # stop moving and colliding in the current tick already
+        self.game.enemy_grid.remove(self.index)
+        self.__engine.deactivate(self.index)
+
+    def delete(self) -> None:
+        if self.__pool is not None and self.__pool.recycle(self):
+            self.canvas.itemconfigure(self.__id, state="hidden")
+        else:
+            self.canvas.delete(self.__id)
+            self.__id = 0
+            self.free_entity()
+
+    def attach_pool(self, pool: "EnemyPool") -> None:
+        """
+        Make the enemy return to the given pool, instead of being destroyed,
+        when it is deleted from the game.  The canvas item is created right
+        away, hidden, so that spawning the enemy later only has to show it.
+        """
+        self.__pool = pool
+        if not self.__id:
+            self.__id = self.canvas.create_oval(0, 0, 0, 0, outline=self.color, width=2,
+                                                state="hidden")
+
+    def reset(self) -> None:
+        """
+        Restore the enemy's movement state to that of a newly created enemy.
+        """
+        self.__engine.reset(self.index)
+
+    def update(self) -> None:
+        # movement is done in batch by the game's EnemyEngine
+        pass
+
+    def render(self) -> None:
+        x, y = self.x, self.y
+        half = self.size / 2
+        self.game.render_batcher.coords(self.__id, x - half, y - half, x + half, y + half)
+
     def hits_player(self):
         """
         Check whether the enemy is hitting the player.
@@ -237,40 +470,10 @@ class ChasingEnemy(Enemy):
     Define a chasing enemy.
     """
 
-    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
-        super().__init__(game, size, color)
-        self.__id = 0
-
-    def create(self) -> None:
-        self.__id = self.canvas.create_oval(0, 0, 0, 0, outline=self.color, width=2)
-
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
-
-    def update(self) -> None:
-        if self.game.player is not None:
-
-            player_x = self.game.player.x
-            player_y = self.game.player.y
-
-            distance = math.sqrt((player_x - self.x) ** 2 + (player_y - self.y) ** 2)
-
-            if distance < self.size:
-                self.game.game_over_lose()
-                return
+    __slots__ = ()
 
-            angle = math.atan2(player_y - self.y, player_x - self.x)
-
-            speed = 3
-            self.x += speed * math.cos(angle)
-            self.y += speed * math.sin(angle)
-
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2)
+    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
+        super().__init__(game, size, color, CHASING, speed=3)
 
 
 class FencingEnemy(Enemy):
@@ -278,55 +481,25 @@ class FencingEnemy(Enemy):
     Define a fencing enemy that walks around the home in a square-like pattern.
     """
 
-    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
-        super().__init__(game, size, color)
-        self.__id = 0
-        self.__step = 0
-        self.__home_x = game.home.x
-        self.__home_y = game.home.y
-        self.__step = 0
-        self.__side_length = 100
-        cn = 100 / 2
-        self.__home_corner = [(self.__home_x - cn, self.__home_y - cn), (self.__home_x + cn, self.__home_y - cn),
-                              (self.__home_x + cn, self.__home_y + cn), (self.__home_x - cn, self.__home_y + cn)]
-
-    def create(self) -> None:
-        self.__id = self.canvas.create_oval(0, 0, 0, 0, outline=self.color, width=2)
+    __slots__ = ()
 
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
+    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
+        super().__init__(game, size, color, FENCING, speed=2, bounds=self.fence(game))
 
-    def update(self) -> None:
-        if self.game.player is not None:
-            if self.hits_player():
-                self.game.game_over_lose()
-                return
-
-            speed = 2
-
-            if self.__step == 0:
-                self.x += speed
-                if self.x >= self.__home_corner[1][0]:
-                    self.__step += 1
-            elif self.__step == 1:
-                self.y += speed
-                if self.y >= self.__home_corner[2][1]:
-                    self.__step += 1
-            elif self.__step == 2:
-                self.x -= speed
-                if self.x <= self.__home_corner[3][0]:
-                    self.__step += 1
-            elif self.__step == 3:
-                self.y -= speed
-                if self.y <= self.__home_corner[0][1]:
-                    self.__step = 0
+    @staticmethod
+    def fence(game: "TurtleAdventureGame") -> tuple[float, float, float, float]:
+        """
+        Get the square walked around the game's home.
+        """
+        cn = 100 / 2
+        home_x = game.home.x
+        home_y = game.home.y
+        return home_x - cn, home_y - cn, home_x + cn, home_y + cn
 
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2)
+    def reset(self) -> None:
+        # home may have moved since the enemy was pooled
+        super().reset()
+        self.game.enemy_engine.set_bounds(self.index, self.fence(self.game))
 
 
 class RandomEnemy(Enemy):
@@ -334,98 +507,204 @@ class RandomEnemy(Enemy):
     Define a random walk enemy.
     """
 
-    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
-        super().__init__(game, size, color)
-        self.__id = 0
-        self.__angle = 45
+    __slots__ = ()
 
-    def create(self) -> None:
-        self.__id = self.canvas.create_oval(0, 0, 0, 0, outline=self.color, width=2)
+    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
+        super().__init__(game, size, color, BOUNCING, speed=3,
+                         heading=game.rng("enemies").uniform(0, 2 * math.pi),
+                         bounds=(0, 0, game.screen_width, game.screen_height))
 
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
+    def reset(self) -> None:
+        # walk off in a new direction each time the enemy is reused
+        super().reset()
+        heading = self.game.rng("enemies").uniform(0, 2 * math.pi)
+        self.game.enemy_engine.heading[self.index] = heading
 
-    def update(self) -> None:
-        if self.game.player is not None:
-            if self.hits_player():
-                self.game.game_over_lose()
-                return
 
-            speed = 3
+class FrontGateEnermy(Enemy):
+    """enemy that walk randomly around the home"""
 
-            self.x += speed * math.cos(self.__angle)
-            self.y += speed * math.sin(self.__angle)
+    __slots__ = ()
 
-            screen_width = self.game.screen_width
-            screen_height = self.game.screen_height
+    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
+        screen_width = game.screen_width
+        screen_height = game.screen_height
+        super().__init__(game, size, color, BOUNCING, speed=3,
+                         heading=game.rng("enemies").uniform(0, 2 * math.pi),
+                         bounds=(screen_width - (screen_width // 4), screen_height // 3,
+                                 screen_width, screen_height - (screen_height // 3)))
 
-            if self.x < 0 or self.x > screen_width:
-                self.__angle = math.pi - self.__angle
-            if self.y < 0 or self.y > screen_height:
-                self.__angle = -self.__angle
+    def reset(self) -> None:
+        # walk off in a new direction each time the enemy is reused
+        super().reset()
+        heading = self.game.rng("enemies").uniform(0, 2 * math.pi)
+        self.game.enemy_engine.heading[self.index] = heading
 
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2)
 
+class EnemyPool:
+    """
+    Keep deleted enemies, with their hidden canvas items, for reuse by later
+    spawns, so that spawning does not allocate new objects or canvas items.
+    Enemies are pooled by type, size and color.
+    """
 
-class FrontGateEnermy(Enemy):
-    """enemy that walk randomly around the home"""
-    def __init__(self, game: "TurtleAdventureGame", size: int, color: str):
-        super().__init__(game, size, color)
-        self.__id = 0
-        self.__angle = 45
+    def __init__(self, game: "TurtleAdventureGame", max_free: int = 1000):
+        self.__game: TurtleAdventureGame = game
+        self.__max_free: int = max_free
+        self.__max_free_by_type: dict[type[Enemy], int] = {}
+        self.__free: dict[tuple[type[Enemy], int, str], list[Enemy]] = {}
+        self.__stats: dict[type[Enemy], dict[str, int]] = {}
+
+    def __stats_of(self, enemy_type: type[Enemy]) -> dict[str, int]:
+        if enemy_type not in self.__stats:
+            self.__stats[enemy_type] = {"hits": 0, "misses": 0, "in_use": 0,
+                                        "high_water": 0, "free": 0}
+        return self.__stats[enemy_type]
+
+    def set_max_free(self, enemy_type: type[Enemy], max_free: int) -> None:
+        """
+        Set how many idle enemies of the given type the pool may hold.
+        """
+        self.__max_free_by_type[enemy_type] = max_free
 
-    def create(self) -> None:
-        self.__id = self.canvas.create_oval(0, 0, 0, 0, outline=self.color, width=2)
+    def prefill(self, enemy_type: type[Enemy], count: int, size: int = 20,
+                color: str = "red") -> None:
+        """
+        Create idle enemies with hidden canvas items ahead of time.
+        """
+        free = self.__free.setdefault((enemy_type, size, color), [])
+        stats = self.__stats_of(enemy_type)
+        for _ in range(count):
+            enemy = enemy_type(self.__game, size, color)
+            enemy.attach_pool(self)
+            free.append(enemy)
+            stats["free"] += 1
+
+    # pylint: disable=too-many-arguments
+    def acquire(self, enemy_type: type[Enemy], x: float, y: float, size: int = 20,
+                color: str = "red") -> Enemy:
+        """
+        Take an idle enemy of the given kind from the pool, or create one if
+        there is none, place it at (x, y) and add it to the game.
+        """
+        free = self.__free.get((enemy_type, size, color))
+        stats = self.__stats_of(enemy_type)
+        if free:
+            enemy = free.pop()
+            enemy.reset()
+            stats["hits"] += 1
+            stats["free"] -= 1
+        else:
+            enemy = enemy_type(self.__game, size, color)
+            enemy.attach_pool(self)
+            stats["misses"] += 1
+        stats["in_use"] += 1
+        stats["high_water"] = max(stats["high_water"], stats["in_use"])
+        enemy.x = x
+        enemy.y = y
+        self.__game.add_element(enemy)
+        return enemy
+
+    def release(self, enemy: Enemy) -> None:
+        """
+        Remove the enemy from the game and return it to the pool.
+        """
+        self.__game.delete_element(enemy)
 
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
+    def recycle(self, enemy: Enemy) -> bool:
+        """
+        Take back an enemy being deleted from the game.  Return False if the
+        pool is full, in which case the enemy should be destroyed instead.
+        """
+        enemy_type = type(enemy)
+        stats = self.__stats_of(enemy_type)
+        stats["in_use"] -= 1
+        max_free = self.__max_free_by_type.get(enemy_type, self.__max_free)
+        if stats["free"] >= max_free:
+            return False
+        self.__free.setdefault((enemy_type, int(enemy.size), enemy.color), []).append(enemy)
+        stats["free"] += 1
+        return True
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get hits, misses, enemies in use, their high-water mark and idle
+        enemies for each enemy type.
+        """
+        return {enemy_type.__name__: dict(stats) for enemy_type, stats in self.__stats.items()}
 
-    def update(self) -> None:
-        if self.game.player is not None:
-            if self.hits_player():
-                self.game.game_over_lose()
-                return
 
-            speed = 3
+class Wave:
+    """
+    One entry of a level's spawn plan: count enemies of one type that become
+    due at the given tick.  They appear at (x, y), scattered up to spread
+    pixels in each direction; a missing x or y is picked anywhere on the
+    screen.  A missing speed keeps the enemy type's own speed.
+    """
 
-            self.x += speed * math.cos(self.__angle)
-            self.y += speed * math.sin(self.__angle)
+    __slots__ = ("tick", "enemy_type", "count", "x", "y", "spread", "size", "color", "speed")
 
-            screen_width = self.game.screen_width
-            screen_height = self.game.screen_height
+    # pylint: disable=too-many-arguments
+    def __init__(self, tick: int, enemy_type: type[Enemy], count: int = 1,
+                 x: float | None = None, y: float | None = None, spread: float = 0,
+                 size: int = 20, color: str = "red", speed: float | None = None):
+        self.tick: int = tick
+        self.enemy_type: type[Enemy] = enemy_type
+        self.count: int = count
+        self.x: float | None = x
+        self.y: float | None = y
+        self.spread: float = spread
+        self.size: int = size
+        self.color: str = color
+        self.speed: float | None = speed
 
-            if self.x < screen_width - (screen_width // 4) or self.x > screen_width:
-                self.__angle = math.pi - self.__angle
-            if self.y < screen_height // 3 or self.y > screen_height - (screen_height // 3):
-                self.__angle = -self.__angle
 
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2)
+def default_waves(level: int, screen_width: int, screen_height: int) -> list[Wave]:
+    """
+    Build the built-in spawn plan of a level: one enemy of each kind right
+    after the start, then level - 1 growing waves of random walkers and
+    chasers coming from the right half of the screen.
+    """
+    waves = [
+        Wave(3, RandomEnemy, 1, 100, 100, color="red"),
+        Wave(3, ChasingEnemy, 1, 200, 200, color="blue"),
+        Wave(3, FencingEnemy, 1, screen_width - 150, (screen_height // 2) - 50, color="orange"),
+        Wave(3, FrontGateEnermy, 1, screen_width - 100, screen_height // 2, color="pink"),
+    ]
+    for number in range(1, level):
+        tick = 150 * number
+        waves.append(Wave(tick, RandomEnemy, 10 * number * level, screen_width * 3 / 4,
+                          screen_height / 2, spread=screen_width / 4, color="red"))
+        waves.append(Wave(tick, ChasingEnemy, number, screen_width - 20, screen_height / 2,
+                          spread=screen_height / 2 - 20, color="blue"))
+    return waves
 
 
 class EnemyGenerator:
     """
     An EnemyGenerator instance is responsible for creating enemies of various
-    kinds and scheduling them to appear at certain points in time.
+    kinds and scheduling them to appear at certain points in time.  It follows
+    a plan of waves driven by the game's tick counter, counted from when the
+    plan was scheduled; enemies of waves that are due are queued and created
+    at most spawn_budget per tick, so that a large wave is spread over
+    several ticks instead of stalling one frame.
     """
 
-    def __init__(self, game: "TurtleAdventureGame", level: int, screen_width: int, screen_height: int):
+    # pylint: disable=too-many-arguments
+    def __init__(self, game: "TurtleAdventureGame", level: int, screen_width: int, screen_height: int,
+                 waves: list[Wave] | None = None, spawn_budget: int = 64):
         self.__game: TurtleAdventureGame = game
         self.__level: int = level
         self.__screen_width = screen_width
         self.__screen_height = screen_height
-
-        # example
-        self.__game.after(100, self.create_enemy)
+        self.__spawn_budget: int = spawn_budget
+        self.__waves: list[Wave] = []
+        self.__next_wave: int = 0
+        self.__start_tick: int = 0
+        self.__queue: deque[tuple[type[Enemy], float, float, int, str, float | None]] = deque()
+        if waves is None:
+            waves = default_waves(level, screen_width, screen_height)
+        self.schedule(waves)
 
     @property
     def game(self) -> "TurtleAdventureGame":
@@ -441,32 +720,250 @@ class EnemyGenerator:
         """
         return self.__level
 
-    def create_enemy(self) -> None:
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of enemies still to be spawned, due or not.
+        """
+        upcoming = sum(wave.count for wave in self.__waves[self.__next_wave:])
+        return upcoming + len(self.__queue)
+
+    @property
+    def is_finished(self) -> bool:
+        """
+        Check whether every wave of the plan has been spawned.
+        """
+        return self.__next_wave == len(self.__waves) and not self.__queue
+
+    def schedule(self, waves: list[Wave]) -> None:
+        """
+        Replace the plan with the given waves, which need not be sorted.
+        Room for all their enemies is reserved up front so that spawning
+        never has to grow the entity columns mid-game.
         """
-        Create a new enemy, possibly based on the game level.
+        self.__waves = sorted(waves, key=lambda wave: wave.tick)
+        self.__next_wave = 0
+        self.__start_tick = self.game.tick
+        self.__queue.clear()
+        total = self.game.entities.high_water + sum(wave.count for wave in self.__waves)
+        self.game.entities.reserve(total)
+        self.game.enemy_engine.reserve(total)
+
+    def update(self, tick: int) -> None:
         """
-        # new_enemy = ChasingEnemy(self.__game, 20, "red")
-        random_enemy = RandomEnemy(self.__game, 20, "red")
-        chasing_enemy = ChasingEnemy(self.__game, 20, "blue")
-        fencing_enemy = FencingEnemy(self.__game, 20, "orange")
-        front_gate_enemy = FrontGateEnermy(self.__game, 20, "pink")
+        Queue the enemies of every wave due at the given tick, then spawn
+        as many queued enemies as the per-tick budget allows.
+        """
+        waves = self.__waves
+        tick -= self.__start_tick
+        while self.__next_wave < len(waves) and waves[self.__next_wave].tick <= tick:
+            self.__queue_wave(waves[self.__next_wave])
+            self.__next_wave += 1
+        queue = self.__queue
+        for _ in range(min(self.__spawn_budget, len(queue))):
+            self.spawn(*queue.popleft())
+
+    def __queue_wave(self, wave: Wave) -> None:
+        rng = self.game.rng("waves")
+        for _ in range(wave.count):
+            x = rng.uniform(0, self.__screen_width) if wave.x is None else wave.x
+            y = rng.uniform(0, self.__screen_height) if wave.y is None else wave.y
+            if wave.spread:
+                x += rng.uniform(-wave.spread, wave.spread)
+                y += rng.uniform(-wave.spread, wave.spread)
+            self.__queue.append((wave.enemy_type, x, y, wave.size, wave.color, wave.speed))
+
+    # pylint: disable=too-many-arguments
+    def spawn(self, enemy_type: type[Enemy], x: float, y: float, size: int = 20,
+              color: str = "red", speed: float | None = None) -> Enemy:
+        """
+        Create an enemy of the given type at (x, y) and add it to the game,
+        reusing a pooled enemy when one is available.
+        """
+        enemy = self.game.enemy_pool.acquire(enemy_type, x, y, size, color)
+        if speed is not None:
+            enemy.speed = speed
+        return enemy
+
+
+ENEMY_TYPES: dict[str, type[Enemy]] = {
+    enemy_type.__name__: enemy_type
+    for enemy_type in (ChasingEnemy, FencingEnemy, RandomEnemy, FrontGateEnermy)
+}
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+
+
+class LevelError(ValueError):
+    """
+    Raised when a level file is missing required settings or has invalid ones.
+    """
 
-        random_enemy.x = 100
-        random_enemy.y = 100
 
-        chasing_enemy.x = 200
-        chasing_enemy.y = 200
+class Level:
+    """
+    A compiled level: where home and the player start, how fast the player
+    moves, the plan of enemy waves and the kind of spatial index ("grid" or
+    "quadtree") that suits its enemy layout.  Compiled levels are cached and
+    shared between games, so they must not be modified.
+    """
 
-        fencing_enemy.x = self.__screen_width - 150
-        fencing_enemy.y = (self.__screen_height // 2) - 50
+    __slots__ = ("name", "home", "home_size", "player_start", "player_speed", "waves",
+                 "spatial_index")
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, name: str, home: tuple[float, float], home_size: int,
+                 player_start: tuple[float, float], player_speed: float, waves: tuple[Wave, ...],
+                 spatial_index: str = "grid"):
+        self.name: str = name
+        self.home: tuple[float, float] = home
+        self.home_size: int = home_size
+        self.player_start: tuple[float, float] = player_start
+        self.player_speed: float = player_speed
+        self.waves: tuple[Wave, ...] = waves
+        self.spatial_index: str = spatial_index
+
+    @classmethod
+    def builtin(cls, level: int, screen_width: int, screen_height: int) -> "Level":
+        """
+        Create the level used when there is no level file: home near the
+        right edge, the player near the left edge and default_waves().
+        """
+        return cls(f"Level {level}", (screen_width - 100, screen_height // 2), 20,
+                   (50, screen_height // 2), 5,
+                   tuple(default_waves(level, screen_width, screen_height)))
 
-        front_gate_enemy.x = self.__screen_width - 100
-        front_gate_enemy.y = self.__screen_height // 2
 
-        self.game.add_element(random_enemy)
-        self.game.add_element(chasing_enemy)
-        self.game.add_element(fencing_enemy)
-        self.game.add_element(front_gate_enemy)
+def level_path(level: int) -> str:
+    """
+    Get the path of the file of the given level number.
+    """
+    return os.path.join(LEVEL_DIR, f"level{level}.json")
+
+
+def load_level_data(level: int, screen_width: int, screen_height: int) -> Level:
+    """
+    Get the compiled settings of the given level from its file in the levels
+    directory, or the built-in level for the given screen size if there is
+    no such file.
+    """
+    path = level_path(level)
+    if os.path.exists(path):
+        return load_level(path)
+    return Level.builtin(level, screen_width, screen_height)
+
+
+def load_level(path: str) -> Level:
+    """
+    Load, validate and compile a JSON level file.  Compiled levels are kept in
+    an LRU cache keyed by path and modification time, so loading the same
+    level again is free unless the file has changed.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError as error:
+        raise LevelError(f"cannot read level file {path}: {error.strerror}") from error
+    return _compile_level(os.path.abspath(path), mtime)
+
+
+_MISSING = object()
+
+
+def _field(data: dict, key: str, kind: type | tuple[type, ...], where: str, default=_MISSING):
+    """
+    Get data[key] after checking its type, or default when it is absent.
+    """
+    if key not in data:
+        if default is _MISSING:
+            raise LevelError(f"{where}: missing '{key}'")
+        return default
+    value = data[key]
+    # bool is an int, but true is never a valid number here
+    if isinstance(value, bool) or not isinstance(value, kind):
+        raise LevelError(f"{where}.{key}: expected {_type_names(kind)}, got {value!r}")
+    return value
+
+
+# pylint: disable=too-many-arguments
+def _bounded(data: dict, key: str, kind: type | tuple[type, ...], where: str, low: float,
+             default=_MISSING, strict: bool = False):
+    """
+    Get data[key] like _field(), after also checking that it is at least low,
+    or above low if strict.
+    """
+    value = _field(data, key, kind, where, default)
+    if value is not None and (value <= low if strict else value < low):
+        bound = "above" if strict else "at least"
+        raise LevelError(f"{where}.{key}: expected a value {bound} {low}, got {value!r}")
+    return value
+
+
+def _type_names(kind: type | tuple[type, ...]) -> str:
+    kinds = kind if isinstance(kind, tuple) else (kind,)
+    return " or ".join(k.__name__ for k in kinds)
+
+
+def _check_keys(data, allowed: set[str], where: str) -> None:
+    if not isinstance(data, dict):
+        raise LevelError(f"{where}: expected an object, got {data!r}")
+    unknown = set(data) - allowed
+    if unknown:
+        raise LevelError(f"{where}: unknown setting(s) {', '.join(sorted(unknown))}")
+
+
+def _point(data: dict, where: str) -> tuple[float, float]:
+    return _field(data, "x", (int, float), where), _field(data, "y", (int, float), where)
+
+
+def _compile_wave(data: dict, speeds: dict[str, float], where: str) -> Wave:
+    _check_keys(data, {"tick", "type", "count", "x", "y", "spread", "size", "color", "speed"},
+                where)
+    type_name = _field(data, "type", str, where)
+    if type_name not in ENEMY_TYPES:
+        raise LevelError(f"{where}.type: unknown enemy type {type_name!r}, "
+                         f"expected one of {', '.join(ENEMY_TYPES)}")
+    tick = _field(data, "tick", int, where)
+    count = _field(data, "count", int, where, 1)
+    if tick < 0 or count < 1:
+        raise LevelError(f"{where}: tick must not be negative and count must be positive")
+    return Wave(tick, ENEMY_TYPES[type_name], count,
+                _field(data, "x", (int, float), where, None),
+                _field(data, "y", (int, float), where, None),
+                _bounded(data, "spread", (int, float), where, 0, 0),
+                _bounded(data, "size", int, where, 0, 20, strict=True),
+                _field(data, "color", str, where, "red"),
+                _bounded(data, "speed", (int, float), where, 0, speeds.get(type_name)))
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_level(path: str, mtime: int) -> Level:  # pylint: disable=unused-argument
+    where = os.path.basename(path)
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, json.JSONDecodeError) as error:
+        raise LevelError(f"{where}: {error}") from error
+    _check_keys(data, {"name", "home", "player", "enemy_speeds", "waves", "spatial_index"}, where)
+    spatial_index = _field(data, "spatial_index", str, where, "grid")
+    if spatial_index not in INDEX_TYPES:
+        raise LevelError(f"{where}.spatial_index: expected one of {', '.join(INDEX_TYPES)}, "
+                         f"got {spatial_index!r}")
+    home = _field(data, "home", dict, where)
+    _check_keys(home, {"x", "y", "size"}, f"{where}.home")
+    player = _field(data, "player", dict, where)
+    _check_keys(player, {"x", "y", "speed"}, f"{where}.player")
+    speeds = _field(data, "enemy_speeds", dict, where, {})
+    _check_keys(speeds, set(ENEMY_TYPES), f"{where}.enemy_speeds")
+    for type_name in speeds:
+        _bounded(speeds, type_name, (int, float), f"{where}.enemy_speeds", 0)
+    waves = _field(data, "waves", list, where)
+    return Level(_field(data, "name", str, where, where),
+                 _point(home, f"{where}.home"),
+                 _bounded(home, "size", int, f"{where}.home", 0, 20, strict=True),
+                 _point(player, f"{where}.player"),
+                 _bounded(player, "speed", (int, float), f"{where}.player", 0, 5, strict=True),
+                 tuple(_compile_wave(wave, speeds, f"{where}.waves[{i}]")
+                       for i, wave in enumerate(waves)),
+                 spatial_index)
 
 
 class TurtleAdventureGame(Game):
@@ -475,36 +972,271 @@ class TurtleAdventureGame(Game):
     """
 
     # pylint: disable=too-many-instance-attributes
-    def __init__(self, parent, screen_width: int, screen_height: int, level: int = 1):
+    # pylint: disable=too-many-arguments
+    def __init__(self, parent, screen_width: int, screen_height: int, level: int = 1,
+                 headless: bool = False, polygon_player: bool = False, seed: int | None = None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed: int = seed
+        self.__rngs: dict[str, random.Random] = {}
         self.level: int = level
         self.screen_width: int = screen_width
         self.screen_height: int = screen_height
         self.waypoint: Waypoint
-        self.player: Player
+        self.player: Player | PolygonPlayer
+        self.polygon_player: bool = polygon_player
         self.home: Home
+        self.level_data: Level
         self.enemies: list[Enemy] = []
         self.enemy_generator: EnemyGenerator
-        super().__init__(parent)
+        self.enemy_engine: EnemyEngine
+        self.flow_field: FlowField
+        self.enemy_grid: SpatialHash | LinearQuadtree
+        self.__grid_stale: bool = False
+        self.__player_last: tuple[float, float] = (0, 0)  # player position at the last check
+        self.enemy_pool: EnemyPool = EnemyPool(self)
+        self.outcome: str | None = None
+        self.__messages: list[int] = []
+        self.__click_listeners: list[Callable[[int, float, float], None]] = []
+        self.__outcome_listeners: list[Callable[[int, str], None]] = []
+        super().__init__(parent, headless=headless)
 
     def init_game(self):
         self.canvas.config(width=self.screen_width, height=self.screen_height)
-        turtle = RawTurtle(self.canvas)
-        # set turtle screen's origin to the top-left corner
-        turtle.screen.setworldcoordinates(0, self.screen_height - 1, self.screen_width - 1, 0)
+        self.level_data = self.load_level_data(self.level)
+        self.enemy_engine = EnemyEngine(self.entities)
+        self.flow_field = FlowField(self.screen_width, self.screen_height, cell_size=20)
+        self.enemy_engine.flow_field = self.flow_field
+        self.set_spatial_index(self.level_data.spatial_index)
+        if self.polygon_player:
+            turtle = None
+        elif self.is_headless:
+            turtle = HeadlessTurtle()
+        else:
+            turtle = RawTurtle(self.canvas)
+            # set turtle screen's origin to the top-left corner
+            turtle.screen.setworldcoordinates(0, self.screen_height - 1, self.screen_width - 1, 0)
 
         self.waypoint = Waypoint(self)
         self.add_element(self.waypoint)
-        self.home = Home(self, (self.screen_width - 100, self.screen_height // 2), 20)
+        level = self.level_data
+        self.home = Home(self, level.home, level.home_size)
         self.add_element(self.home)
-        self.player = Player(self, turtle)
+        if turtle is None:
+            self.player = PolygonPlayer(self, level.player_speed)
+        else:
+            self.player = Player(self, turtle, level.player_speed)
         self.add_element(self.player)
-        self.canvas.bind("<Button-1>", lambda e: self.waypoint.activate(e.x, e.y))
+        self.canvas.bind("<Button-1>", lambda e: self.click(e.x, e.y))
 
         self.enemy_generator = EnemyGenerator(self, level=self.level, screen_width=self.screen_width,
-                                              screen_height=self.screen_height)
+                                              screen_height=self.screen_height,
+                                              waves=list(level.waves))
+
+        self.player.x, self.player.y = level.player_start
+        self.__player_last = level.player_start
+
+    def load_level_data(self, level: int) -> Level:
+        """
+        Get the compiled settings of the given level from its file in the
+        levels directory, or the built-in level if there is no such file.
+        """
+        return load_level_data(level, self.screen_width, self.screen_height)
+
+    def reset(self, level: int | None = None) -> None:
+        """
+        Start the game over, on the given level or the current one, without
+        recreating the canvas: enemies go back to the pool, home, the player
+        and the waypoint are reused and the game-over message is removed.
+        The random streams carry on, and reused random walkers draw a new
+        heading from them, so a new round differs from the last.
+        Called during a tick, e.g., from an outcome listener, the reset is
+        deferred until the tick is over.
+        """
+        if self.in_tick:
+            self.after(0, self.reset, level)
+            return
+        self.stop()
+        for message in self.__messages:
+            self.canvas.delete(message)
+        self.__messages.clear()
+        # every enemy, pooled or added with add_enemy(), has an active engine
+        # row, and pooled ones go back to their pool when deleted
+        entities = self.entities
+        for row in self.enemy_engine.rows.tolist():
+            self.delete_element(entities.owner(row))
+        self.enemies.clear()
+
+        if level is not None:
+            self.level = level
+        self.level_data = self.load_level_data(self.level)
+        data = self.level_data
+        self.set_spatial_index(data.spatial_index)
+        self.home.x, self.home.y = data.home
+        self.home.size = data.home_size
+        self.waypoint.deactivate()
+        self.player.speed = data.player_speed
+        self.player.x, self.player.y = data.player_start
+        self.__player_last = data.player_start
+        self.enemy_generator = EnemyGenerator(self, level=self.level,
+                                              screen_width=self.screen_width,
+                                              screen_height=self.screen_height,
+                                              waves=list(data.waves))
+        self.outcome = None
+        self.start()
+
+    def click(self, x: float, y: float) -> None:
+        """
+        Handle a click at (x, y) by moving the waypoint there.  Click
+        listeners are told about it along with the number of ticks run so far.
+        """
+        for listener in self.__click_listeners:
+            listener(self.tick, x, y)
+        self.waypoint.activate(x, y)
+
+    def add_click_listener(self, listener: Callable[[int, float, float], None]) -> None:
+        """
+        Register a function to be called with (tick, x, y) on every click.
+        """
+        self.__click_listeners.append(listener)
 
-        self.player.x = 50
-        self.player.y = self.screen_height // 2
+    def rng(self, stream: str) -> random.Random:
+        """
+        Get the random number generator of the named subsystem.  Each stream
+        is derived from the game's seed and its name only, so a game created
+        with the same seed draws the same numbers in every stream regardless
+        of how the other streams are used.
+        """
+        if stream not in self.__rngs:
+            self.__rngs[stream] = random.Random(f"{self.seed}:{stream}")
+        return self.__rngs[stream]
+
+    def post_update(self) -> None:
+        """
+        Spawn the enemies due this tick, move all enemies in one batched
+        step, then run the collision stage over the tick's motion and end the
+        game if it produced an outcome.
+        """
+        self.enemy_generator.update(self.tick)
+        self.enemy_engine.step(self.player.x, self.player.y)
+        self.__grid_stale = True
+        outcome = self.resolve_collisions()
+        if outcome is not None:
+            self.end_game(outcome)
+
+    def viewport(self) -> tuple[float, float, float, float]:
+        return 0, 0, self.screen_width, self.screen_height
+
+    def render_focus(self) -> tuple[float, float]:
+        return self.player.x, self.player.y
+
+    def resolve_collisions(self) -> str | None:
+        """
+        Run the collision stage, once per tick after all movement: sweep the
+        player's motion since the last stage against all nearby enemies in
+        one batched pass and against home, so fast objects cannot pass
+        through each other between two ticks.  Return "lose" or "win",
+        whichever contact happened first in the tick, or None.
+        """
+        self.sync_enemy_grid()
+        x0, y0 = self.__player_last
+        x1, y1 = self.player.x, self.player.y
+        self.__player_last = (x1, y1)
+        rows = self.enemies_near_player(x0, y0)
+        hit = self.enemy_engine.first_contact(x0, y0, x1, y1, rows)
+        home = self.home.first_contact(x0, y0, x1, y1)
+        if hit is not None and (home is None or hit <= home):
+            return "lose"
+        if home is not None:
+            return "win"
+        return None
+
+    def end_game(self, outcome: str) -> None:
+        """
+        End the game with the given outcome, "win" or "lose", unless it has
+        already ended.  Outcome listeners are told once, then the game-over
+        message is shown.
+        """
+        if self.outcome is not None:
+            return
+        self.outcome = outcome
+        for listener in self.__outcome_listeners:
+            listener(self.tick, outcome)
+        if outcome == "win":
+            self.game_over_win()
+        else:
+            self.game_over_lose()
+
+    def add_outcome_listener(self, listener: Callable[[int, str], None]) -> None:
+        """
+        Register a function to be called with (tick, outcome) when the game
+        ends.
+        """
+        self.__outcome_listeners.append(listener)
+
+    def sync_enemy_grid(self) -> None:
+        """
+        Move enemies that changed cell to their new bucket in the enemy grid.
+        """
+        engine = self.enemy_engine
+        rows = engine.rows
+        self.enemy_grid.sync(rows, engine.x[rows], engine.y[rows])
+        self.__grid_stale = False
+
+    def set_spatial_index(self, kind: str) -> None:
+        """
+        Switch the index behind collision checks and neighbourhood queries
+        to a new one of the given kind, "grid" or "quadtree", holding the
+        current enemies.
+        """
+        self.enemy_grid = create_index(kind, self.screen_width, self.screen_height)
+        self.sync_enemy_grid()
+
+    def query_rect(self, x1: float, y1: float, x2: float, y2: float) -> list[Enemy]:
+        """
+        Return the enemies whose centre lies in the rectangle from (x1, y1)
+        to (x2, y2).  Only the grid cells overlapping the rectangle are
+        visited, so the cost grows with the number of nearby enemies rather
+        than with the number of enemies in the game.
+        """
+        rows = self.__candidates(x1, y1, x2, y2)
+        xs = self.enemy_engine.x[rows]
+        ys = self.enemy_engine.y[rows]
+        owner = self.entities.owner
+        return [owner(row) for row in
+                rows[(xs >= x1) & (xs <= x2) & (ys >= y1) & (ys <= y2)].tolist()]
+
+    def query_radius(self, x: float, y: float, radius: float) -> list[Enemy]:
+        """
+        Return the enemies whose centre lies within radius of (x, y).
+        """
+        rows = self.__candidates(x - radius, y - radius, x + radius, y + radius)
+        dx = self.enemy_engine.x[rows] - x
+        dy = self.enemy_engine.y[rows] - y
+        owner = self.entities.owner
+        return [owner(row) for row in rows[dx * dx + dy * dy <= radius * radius].tolist()]
+
+    def __candidates(self, x1: float, y1: float, x2: float, y2: float) -> np.ndarray:
+        # the engine rows in the grid cells overlapping the rectangle
+        if self.__grid_stale:
+            self.sync_enemy_grid()
+        return np.asarray(self.enemy_grid.query_rect(x1, y1, x2, y2), dtype=np.int64)
+
+    def enemies_near_player(self, from_x: float | None = None,
+                            from_y: float | None = None) -> list[int] | np.ndarray:
+        """
+        Return the engine rows of enemies close enough to possibly have hit
+        the player on its way from (from_x, from_y), by default its current
+        position; only these need the exact collision test.
+        """
+        engine = self.enemy_engine
+        # an enemy may also have moved up to its speed during the tick
+        reach = engine.max_size + engine.max_speed
+        x, y = self.player.x, self.player.y
+        from_x = x if from_x is None else from_x
+        from_y = y if from_y is None else from_y
+        return self.enemy_grid.query_rect(min(x, from_x) - reach, min(y, from_y) - reach,
+                                          max(x, from_x) + reach, max(y, from_y) + reach)
 
     def add_enemy(self, enemy: Enemy) -> None:
         """
@@ -518,24 +1250,28 @@ class TurtleAdventureGame(Game):
         Called when the player wins the game and stop the game.
         """
         self.stop()
+        if self.outcome is None:
+            self.outcome = "win"
         font = ("Arial", 36, "bold")
-        self.canvas.create_text(self.screen_width / 2,
-                                self.screen_height / 2,
-                                text="You Win",
-                                font=font,
-                                fill="green")
+        self.__messages.append(self.canvas.create_text(self.screen_width / 2,
+                                                       self.screen_height / 2,
+                                                       text="You Win",
+                                                       font=font,
+                                                       fill="green"))
 
     def game_over_lose(self) -> None:
         """
         Called when the player loses the game and stop the game.
         """
         self.stop()
+        if self.outcome is None:
+            self.outcome = "lose"
         font = ("Arial", 36, "bold")
-        self.canvas.create_text(self.screen_width / 2,
-                                self.screen_height / 2,
-                                text="You Lose",
-                                font=font,
-                                fill="red")
+        self.__messages.append(self.canvas.create_text(self.screen_width / 2,
+                                                       self.screen_height / 2,
+                                                       text="You Lose",
+                                                       font=font,
+                                                       fill="red"))
 
     def show_level(self, level: int):
         """show level"""